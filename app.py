@@ -5,46 +5,64 @@ Flask backend that integrates with your existing medical_agent.py
 
 import re
 import html
+import atexit
 import logging
 import os
+import sys
 import json
+import hmac
 import uuid
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from datetime import datetime
 from typing import Dict, List, Tuple, Optional, Any
 import traceback
-from flask import Flask, request, jsonify, render_template
+
+PROCESS_STARTED_AT = time.perf_counter()
+
+from flask import Flask, Response, g, request, jsonify, render_template, stream_with_context
 from flask_cors import CORS
 
-# Configure logging
-if not os.path.exists('logs'):
-    os.makedirs('logs')
-
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(f'logs/health_chatbot_{datetime.now().strftime("%Y%m%d")}.log'),
-        logging.StreamHandler()
-    ]
+from component_registry import ComponentRegistry
+from response_cache import ResponseCache
+from session_store import create_session_store
+
+# Logging, metrics and profiling are shared with the FastAPI backend, which ships them itself
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+from observability.log_pipeline import setup_logging
+from observability.metrics import PROMETHEUS_CONTENT_TYPE, REGISTRY, STAGE_LATENCY, record_request, stage_timer
+from observability.profiling import PROFILE_HEADER, RequestProfiler
+
+# Configure logging: the request path only enqueues records; a background
+# writer batches them into size-rotated JSON lines under logs/ and the console
+log_pipeline = setup_logging(
+    'logs',
+    'health_chatbot.log',
+    max_bytes=int(os.getenv('LOG_MAX_BYTES', str(50 * 1024 * 1024))),
+    backup_count=int(os.getenv('LOG_BACKUP_COUNT', '5')),
+    queue_size=int(os.getenv('LOG_QUEUE_SIZE', '10000'))
 )
 logger = logging.getLogger(__name__)
 
-# Import your existing modules
-try:
+# Your existing modules load lazily, on first use or via POST /api/health/warmup,
+# so the server binds its port without waiting on model and data loading
+def _load_medical_agent():
     from medical_agent import process_health_query  # Adjust import based on your actual function
-    MEDICAL_AGENT_AVAILABLE = True
-    logger.info("Successfully imported medical_agent module")
-except ImportError as e:
-    logger.warning(f"Could not import medical_agent: {e}")
-    MEDICAL_AGENT_AVAILABLE = False
+    return process_health_query
 
-try:
+def _load_specialist_recommender():
     from DoctorSpecialistRecommend.doctor_spec import get_specialist_recommendation
-    SPECIALIST_RECOMMENDER_AVAILABLE = True
-    logger.info("Successfully imported doctor specialist module")
-except ImportError as e:
-    logger.warning(f"Could not import doctor specialist module: {e}")
-    SPECIALIST_RECOMMENDER_AVAILABLE = False
+    return get_specialist_recommendation
+
+components = ComponentRegistry(started_at=PROCESS_STARTED_AT)
+components.register('medical_agent', _load_medical_agent, module_name='medical_agent')
+components.register('specialist_recommender', _load_specialist_recommender,
+                    module_name='DoctorSpecialistRecommend.doctor_spec')
+
+if os.getenv('WARMUP_ON_START', '').lower() in ('1', 'true', 'yes'):
+    threading.Thread(target=components.warmup, name='component-warmup', daemon=True).start()
 
 class InputValidator:
     """Comprehensive input validation for health queries"""
@@ -83,6 +101,30 @@ class InputValidator:
         
         # Allowed characters (alphanumeric + basic punctuation)
         self.allowed_pattern = re.compile(r'^[a-zA-Z0-9\s.,!?;:()\-\'"]+$')
+        
+        # Precompiled matchers, built once so validate_input scans the text a
+        # single time per check instead of once per pattern/term
+        self._whitespace_pattern = re.compile(r'\s+')
+        self._special_char_pattern = re.compile(r'[^a-zA-Z0-9\s.,!?;:()\-\'\""]')
+        self._malicious_pattern = re.compile(
+            '|'.join(f'(?:{pattern.lower()})' for pattern in self.malicious_patterns)
+        )
+        self._term_table = tuple(
+            (term, term in self.medical_terms, term in self.urgency_keywords)
+            for term in sorted(self.medical_terms | self.urgency_keywords)
+        )
+    
+    def _scan_terms(self, text_lower: str) -> Tuple[int, bool]:
+        """Single pass over the term table: (medical term count, has urgency)"""
+        medical_term_count = 0
+        has_urgency = False
+        for term, is_medical, is_urgent in self._term_table:
+            if term in text_lower:
+                if is_medical:
+                    medical_term_count += 1
+                if is_urgent:
+                    has_urgency = True
+        return medical_term_count, has_urgency
     
     def validate_input(self, user_input: str) -> Dict[str, Any]:
         """Validate user input with comprehensive checks"""
@@ -105,7 +147,7 @@ class InputValidator:
             # Clean input
             cleaned_input = str(user_input).strip()
             cleaned_input = html.escape(cleaned_input)
-            cleaned_input = re.sub(r'\s+', ' ', cleaned_input)
+            cleaned_input = self._whitespace_pattern.sub(' ', cleaned_input)
             
             # Empty/whitespace check
             if not cleaned_input or cleaned_input.isspace():
@@ -133,11 +175,11 @@ class InputValidator:
                 result['error_message'] = "Query too long. Please be more concise."
                 return result
             
-            # Security check
-            for pattern in self.malicious_patterns:
-                if re.search(pattern, cleaned_input, re.IGNORECASE):
-                    result['error_message'] = "Input contains potentially harmful content. Please rephrase your query."
-                    return result
+            # Security check (patterns are lower-cased, so match on lower-cased text)
+            text_lower = cleaned_input.lower()
+            if self._malicious_pattern.search(text_lower):
+                result['error_message'] = "Input contains potentially harmful content. Please rephrase your query."
+                return result
             
             # Character pattern validation (alphanumeric + basic punctuation only)
             if not self.allowed_pattern.match(cleaned_input):
@@ -145,24 +187,22 @@ class InputValidator:
                 return result
             
             # Special character ratio check
-            special_chars = len(re.findall(r'[^a-zA-Z0-9\s.,!?;:()\-\'\""]', cleaned_input))
+            special_chars = len(self._special_char_pattern.findall(cleaned_input))
             special_char_ratio = special_chars / len(cleaned_input) if cleaned_input else 0
             if special_char_ratio > self.config['max_special_char_ratio']:
                 result['error_message'] = "Too many special characters. Please use standard text."
                 return result
             
             # Health relevance check
-            text_lower = cleaned_input.lower()
-            is_health_related = any(term in text_lower for term in self.medical_terms)
-            has_urgency = any(keyword in text_lower for keyword in self.urgency_keywords)
+            medical_term_count, has_urgency = self._scan_terms(text_lower)
+            is_health_related = medical_term_count > 0
             
             # Confidence score calculation
             confidence_score = 0.0
             if len(words) >= 3:
                 confidence_score += 0.2
-            medical_term_count = sum(1 for term in self.medical_terms if term in text_lower)
             confidence_score += min(medical_term_count * 0.15, 0.5)
-            if re.search(r'\?', cleaned_input):
+            if '?' in cleaned_input:
                 confidence_score += 0.1
             confidence_score = min(confidence_score, 1.0)
             
@@ -187,10 +227,10 @@ class InputValidator:
             if warnings:
                 result['warning_message'] = " | ".join(warnings)
             
-            logger.info(f"Input validation successful: {cleaned_input[:50]}...")
+            logger.info("Input validation successful: %s...", cleaned_input[:50])
             
         except Exception as e:
-            logger.error(f"Validation error: {str(e)}")
+            logger.error("Validation error: %s", e)
             result['error_message'] = "An error occurred while processing your input."
         
         return result
@@ -199,9 +239,194 @@ class InputValidator:
 app = Flask(__name__)
 CORS(app)
 
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_latency(response):
+    """Feed the per-route latency histogram (streamed bodies count until headers are sent)"""
+    started = g.pop('request_started', None)
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        record_request(request.method, route, response.status_code, time.perf_counter() - started)
+    return response
+
+# Opt-in request profiling: requests carrying X-Profile-Token: $PROFILE_TOKEN, or a
+# PROFILE_SAMPLE_RATE fraction of requests, are profiled into logs/profiles.
+# With neither configured the hooks below are not installed.
+request_profiler = RequestProfiler(
+    os.path.join('logs', 'profiles'),
+    include_paths=[os.path.dirname(os.path.abspath(__file__))],
+    token=os.getenv('PROFILE_TOKEN'),
+    sample_rate=float(os.getenv('PROFILE_SAMPLE_RATE', '0'))
+)
+
+def finish_request_profile(status: int) -> Optional[str]:
+    session = g.pop('profile', None)
+    if session is None:
+        return None
+    route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    path = request_profiler.finish(session, request.method, route, status)
+    logger.info("Request profile written to %s", path)
+    return path.name
+
+if request_profiler.enabled:
+    @app.before_request
+    def start_request_profile():
+        if request_profiler.should_profile(request.headers.get(PROFILE_HEADER)):
+            g.profile = request_profiler.start()
+
+    @app.after_request
+    def attach_request_profile(response):
+        profile_name = finish_request_profile(response.status_code)
+        if profile_name:
+            response.headers['X-Profile'] = profile_name
+        return response
+
+    @app.teardown_request
+    def release_request_profile(error=None):
+        # Requests that failed before after_request still release the profiler
+        finish_request_profile(500)
+
 # Initialize validator
 validator = InputValidator()
-chat_history = {}
+
+# Chat history backend: 'memory' (per process) or 'sqlite' (shared by workers)
+chat_history = create_session_store(
+    os.getenv('SESSION_BACKEND', 'memory'),
+    db_path=os.getenv('SESSION_DB_PATH', os.path.join('data', 'chat_history.db')),
+    capacity=int(os.getenv('SESSION_CAPACITY', '10000')),
+    ttl_seconds=float(os.getenv('SESSION_TTL_SECONDS', '3600')),
+    history_size=10
+)
+atexit.register(chat_history.close)
+
+# Cache of complete answers keyed on the normalized query. Call
+# POST /api/health/cache/invalidate (with the X-Admin-Token header) after
+# re-ingesting the knowledge base.
+response_cache = ResponseCache(
+    max_entries=int(os.getenv('RESPONSE_CACHE_SIZE', '1000')),
+    ttl_seconds=float(os.getenv('RESPONSE_CACHE_TTL_SECONDS', '3600'))
+)
+# Admin endpoints stay closed (403) until a token is configured
+CACHE_ADMIN_TOKEN = os.getenv('CACHE_ADMIN_TOKEN')
+
+# Upper bound on queries accepted by the batch endpoints
+MAX_BATCH_SIZE = 100
+
+# Bounded pool that runs the medical agent and specialist lookup side by side.
+# Deadlines are measured from submission, so queued work counts against them.
+QUERY_POOL_SIZE = int(os.getenv('QUERY_POOL_SIZE', '8'))
+AGENT_TIMEOUT_SECONDS = float(os.getenv('AGENT_TIMEOUT_SECONDS', '30'))
+SPECIALIST_TIMEOUT_SECONDS = float(os.getenv('SPECIALIST_TIMEOUT_SECONDS', '5'))
+query_executor = ThreadPoolExecutor(max_workers=QUERY_POOL_SIZE, thread_name_prefix='health-query')
+
+# Batch queries get their own pool and at most BATCH_CONCURRENCY queries in
+# flight (two stages each), so a large batch cannot starve interactive queries
+BATCH_CONCURRENCY = int(os.getenv('BATCH_CONCURRENCY', '2'))
+batch_executor = ThreadPoolExecutor(max_workers=2 * BATCH_CONCURRENCY, thread_name_prefix='health-batch')
+
+AGENT_ERROR_RESPONSE = "I encountered an error processing your query. Please try rephrasing your question."
+
+def run_medical_agent(cleaned_input: str) -> str:
+    """Medical agent stage, falling back to a generic reply on errors"""
+    try:
+        process_health_query = components.get('medical_agent')
+        if process_health_query is not None:
+            with stage_timer('medical_agent'):
+                # Streaming agents yield text chunks; join them for JSON responses
+                result = process_health_query(cleaned_input)
+                return result if isinstance(result, str) else ''.join(result)
+        return f"Thank you for your health query: '{cleaned_input}'. I recommend consulting with a healthcare professional for personalized advice."
+    except Exception as e:
+        logger.error("Medical agent error: %s", e)
+        return AGENT_ERROR_RESPONSE
+
+def run_specialist_lookup(cleaned_input: str) -> List[Any]:
+    """Specialist recommendation stage, returning no specialists on errors"""
+    try:
+        get_specialist_recommendation = components.get('specialist_recommender')
+        if get_specialist_recommendation is None:
+            return []
+        with stage_timer('specialist_lookup'):
+            return get_specialist_recommendation(cleaned_input) or []
+    except Exception as e:
+        logger.error("Specialist recommendation error: %s", e)
+        return []
+
+def submit_query_stages(validation_result: Dict[str, Any], include_agent: bool = True,
+                        executor: ThreadPoolExecutor = query_executor) -> Dict[str, Any]:
+    """Submit the agent and specialist stages for a validated query to the pool"""
+    cleaned_input = validation_result['cleaned_input']
+    submitted_at = time.monotonic()
+    stages = {}
+    if include_agent:
+        stages['ai_response'] = (
+            executor.submit(request_profiler.bind(run_medical_agent), cleaned_input),
+            submitted_at + AGENT_TIMEOUT_SECONDS
+        )
+    if validation_result['is_health_related'] and components.available('specialist_recommender'):
+        stages['specialist_recommendations'] = (
+            executor.submit(request_profiler.bind(run_specialist_lookup), cleaned_input),
+            submitted_at + SPECIALIST_TIMEOUT_SECONDS
+        )
+    return stages
+
+def collect_query_stages(stages: Dict[str, Any]) -> Tuple[str, List[Any], List[str]]:
+    """Wait for submitted stages; returns (ai_response, specialists, timed_out_stages)"""
+    fallbacks = {
+        'ai_response': "I'm taking longer than expected to answer. Please try again in a moment.",
+        'specialist_recommendations': []
+    }
+    results = dict(fallbacks)
+    timed_out = []
+    for stage_name, (future, deadline) in stages.items():
+        try:
+            results[stage_name] = future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FutureTimeoutError:
+            future.cancel()
+            timed_out.append(stage_name)
+            logger.warning("Stage '%s' missed its deadline", stage_name)
+    return results['ai_response'], results['specialist_recommendations'], timed_out
+
+def cache_query_result(validation_result: Dict[str, Any], ai_response: str,
+                       specialists: List[Any], timed_out: List[str]) -> None:
+    """Cache a complete agent answer; partial and fallback replies are skipped"""
+    if components.available('medical_agent') and not timed_out and ai_response != AGENT_ERROR_RESPONSE:
+        response_cache.put(validation_result['cleaned_input'], (ai_response, specialists))
+
+def record_interaction(session_id: str, validation_result: Dict[str, Any], ai_response: str) -> None:
+    """Log an interaction in chat history (the store keeps the last 10 per session)"""
+    chat_history.append(session_id, {
+        'timestamp': datetime.now().isoformat(),
+        'query': validation_result['cleaned_input'][:100],
+        'response_length': len(ai_response),
+        'confidence': validation_result['confidence_score'],
+        'is_health_related': validation_result['is_health_related']
+    })
+
+def admin_authorized() -> bool:
+    """True if the request carries the configured admin token; always False without one"""
+    token = request.headers.get('X-Admin-Token', '')
+    return bool(CACHE_ADMIN_TOKEN) and hmac.compare_digest(token.encode(), CACHE_ADMIN_TOKEN.encode())
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def build_query_data(validation_result: Dict[str, Any], ai_response: str,
+                     specialists: List[Any], timed_out: List[str]) -> Dict[str, Any]:
+    """Response payload shared by the single and batch query endpoints"""
+    return {
+        'ai_response': ai_response,
+        'confidence': validation_result['confidence_score'],
+        'is_health_related': validation_result['is_health_related'],
+        'has_urgency': validation_result['has_urgency'],
+        'specialist_recommendations': specialists if specialists else [],
+        'partial_result': bool(timed_out),
+        'timed_out_stages': timed_out
+    }
 
 @app.route('/', methods=['GET'])
 def index():
@@ -217,14 +442,18 @@ def handle_health_query():
         if not data:
             return jsonify({'success': False, 'error': 'No data provided'}), 400
         
-        user_input = data.get('query', '').strip()
+        user_input = data.get('query', '')
         session_id = data.get('session_id', str(uuid.uuid4())[:8])
         
-        if not user_input:
+        if not isinstance(user_input, str) or not user_input.strip():
             return jsonify({'success': False, 'error': 'Query cannot be empty'}), 400
+        if not isinstance(session_id, str) or not session_id:
+            return jsonify({'success': False, 'error': 'session_id must be a non-empty string'}), 400
+        user_input = user_input.strip()
         
         # Validate input
-        validation_result = validator.validate_input(user_input)
+        with stage_timer('validation'):
+            validation_result = validator.validate_input(user_input)
         
         if not validation_result['is_valid']:
             return jsonify({
@@ -234,60 +463,203 @@ def handle_health_query():
         
         cleaned_input = validation_result['cleaned_input']
         
-        # Get AI response
-        try:
-            if MEDICAL_AGENT_AVAILABLE:
-                ai_response = process_health_query(cleaned_input)
-            else:
-                ai_response = f"Thank you for your health query: '{cleaned_input}'. I recommend consulting with a healthcare professional for personalized advice."
-        except Exception as e:
-            logger.error(f"Medical agent error: {e}")
-            ai_response = "I encountered an error processing your query. Please try rephrasing your question."
+        # Serve repeated questions from the cache, otherwise run the medical
+        # agent and specialist lookup concurrently
+        with stage_timer('response_cache'):
+            cached = response_cache.get(cleaned_input)
+        if cached is not None:
+            (ai_response, specialists), timed_out = cached, []
+        else:
+            with stage_timer('query_stages'):
+                stages = submit_query_stages(validation_result)
+                ai_response, specialists, timed_out = collect_query_stages(stages)
+            cache_query_result(validation_result, ai_response, specialists, timed_out)
         
-        # Get specialist recommendations
-        specialists = []
-        if SPECIALIST_RECOMMENDER_AVAILABLE and validation_result['is_health_related']:
-            try:
-                specialists = get_specialist_recommendation(cleaned_input)
-            except Exception as e:
-                logger.error(f"Specialist recommendation error: {e}")
-        
-        # Log interaction
-        if session_id not in chat_history:
-            chat_history[session_id] = []
-        
-        chat_history[session_id].append({
-            'timestamp': datetime.now().isoformat(),
-            'query': cleaned_input[:100],
-            'response_length': len(ai_response),
-            'confidence': validation_result['confidence_score'],
-            'is_health_related': validation_result['is_health_related']
-        })
-        
-        # Keep only last 10 interactions per session
-        if len(chat_history[session_id]) > 10:
-            chat_history[session_id] = chat_history[session_id][-10:]
+        with stage_timer('chat_history'):
+            record_interaction(session_id, validation_result, ai_response)
         
         response = {
             'success': True,
             'message': 'Query processed successfully',
-            'data': {
-                'ai_response': ai_response,
-                'confidence': validation_result['confidence_score'],
-                'is_health_related': validation_result['is_health_related'],
-                'has_urgency': validation_result['has_urgency'],
-                'specialist_recommendations': specialists if specialists else []
-            }
+            'data': build_query_data(validation_result, ai_response, specialists, timed_out)
         }
         
         if validation_result['warning_message']:
             response['warning'] = validation_result['warning_message']
         
-        logger.info(f"Query processed successfully for session {session_id}")
+        logger.info("Query processed successfully for session %s", session_id, extra={'session_id': session_id})
         return jsonify(response), 200
         
     except Exception as e:
-        logger.error(f"API error: {str(e)}")
+        logger.error("API error: %s", e)
+        return jsonify({'success': False, 'error': 'Internal server error'}), 500
+
+@app.route('/api/health/query/stream', methods=['POST'])
+def handle_health_query_stream():
+    """Streaming variant of /api/health/query using Server-Sent Events.
+    
+    Emits a `validation` event right away, `token` events as the medical
+    agent yields text (an agent returning a plain string is sent as one
+    token), then a `done` event with specialists, metadata and timings. A
+    failure after the stream has started ends it with an `error` event.
+    """
+    started = time.perf_counter()
+    data = request.get_json(silent=True)
+    
+    if not data:
+        return jsonify({'success': False, 'error': 'No data provided'}), 400
+    
+    user_input = data.get('query', '')
+    session_id = data.get('session_id', str(uuid.uuid4())[:8])
+    
+    if not isinstance(user_input, str) or not user_input.strip():
+        return jsonify({'success': False, 'error': 'Query cannot be empty'}), 400
+    if not isinstance(session_id, str) or not session_id:
+        return jsonify({'success': False, 'error': 'session_id must be a non-empty string'}), 400
+    user_input = user_input.strip()
+    
+    validation_result = validator.validate_input(user_input)
+    if not validation_result['is_valid']:
+        return jsonify({
+            'success': False,
+            'error': validation_result['error_message']
+        }), 400
+    
+    cleaned_input = validation_result['cleaned_input']
+    
+    def elapsed_ms() -> float:
+        return round((time.perf_counter() - started) * 1000, 2)
+    
+    def generate():
+        try:
+            yield from stream_events()
+        except Exception as e:
+            # The 200 and SSE headers are already sent; tell the client in-band
+            logger.error("Streaming error for session %s: %s", session_id, e)
+            yield sse_event('error', {'error': 'Internal server error'})
+    
+    def stream_events():
+        yield sse_event('validation', {
+            'session_id': session_id,
+            'confidence': validation_result['confidence_score'],
+            'is_health_related': validation_result['is_health_related'],
+            'has_urgency': validation_result['has_urgency'],
+            'warning': validation_result['warning_message']
+        })
+        first_event_ms = elapsed_ms()
+        first_token_ms = None
+        
+        cached = response_cache.get(cleaned_input)
+        if cached is not None:
+            ai_response, specialists = cached
+            yield sse_event('token', {'text': ai_response})
+            first_token_ms = elapsed_ms()
+            timed_out = []
+        else:
+            # Specialist lookup runs in the pool while the agent streams here
+            stages = submit_query_stages(validation_result, include_agent=False)
+            parts = []
+            try:
+                process_health_query = components.get('medical_agent')
+                if process_health_query is not None:
+                    result = process_health_query(cleaned_input)
+                    chunks = [result] if isinstance(result, str) else result
+                else:
+                    chunks = [run_medical_agent(cleaned_input)]
+                for chunk in chunks:
+                    parts.append(chunk)
+                    yield sse_event('token', {'text': chunk})
+                    if first_token_ms is None:
+                        first_token_ms = elapsed_ms()
+            except Exception as e:
+                logger.error("Medical agent streaming error: %s", e)
+                parts = [AGENT_ERROR_RESPONSE]
+                yield sse_event('token', {'text': AGENT_ERROR_RESPONSE})
+            ai_response = ''.join(parts)
+            _, specialists, timed_out = collect_query_stages(stages)
+            cache_query_result(validation_result, ai_response, specialists, timed_out)
+        
+        record_interaction(session_id, validation_result, ai_response)
+        
+        done = build_query_data(validation_result, ai_response, specialists, timed_out)
+        del done['ai_response']
+        done['timing'] = {
+            'first_event_ms': first_event_ms,
+            'first_token_ms': first_token_ms,
+            'total_ms': elapsed_ms()
+        }
+        logger.info("Streamed query for session %s (first token %s ms, total %s ms)", session_id, first_token_ms, done['timing']['total_ms'])
+        yield sse_event('done', done)
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/api/health/query/batch', methods=['POST'])
+def handle_health_query_batch():
+    """Process a list of health queries through the batch pool.
+    
+    Batch queries are not recorded in chat history.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        queries = data.get('queries')
+        
+        if not isinstance(queries, list) or not queries:
+            return jsonify({'success': False, 'error': 'Provide a non-empty list of queries'}), 400
+        
+        if len(queries) > MAX_BATCH_SIZE:
+            return jsonify({
+                'success': False,
+                'error': f'Too many queries. Please send at most {MAX_BATCH_SIZE} per batch.'
+            }), 400
+        
+        pending = []
+        for query in queries:
+            validation_result = validator.validate_input(query.strip() if isinstance(query, str) else query)
+            cached = response_cache.get(validation_result['cleaned_input']) if validation_result['is_valid'] else None
+            pending.append((validation_result, cached))
+        
+        # Keep BATCH_CONCURRENCY queries in flight; deadlines start when a
+        # query is submitted, not while it waits for a slot
+        to_submit = deque(
+            index for index, (validation_result, cached) in enumerate(pending)
+            if validation_result['is_valid'] and cached is None
+        )
+        in_flight = {}
+        
+        def submit_next():
+            while to_submit and len(in_flight) < BATCH_CONCURRENCY:
+                index = to_submit.popleft()
+                in_flight[index] = submit_query_stages(pending[index][0], executor=batch_executor)
+        
+        submit_next()
+        results = []
+        for index, (validation_result, cached) in enumerate(pending):
+            if not validation_result['is_valid']:
+                results.append({'success': False, 'error': validation_result['error_message']})
+                continue
+            if cached is not None:
+                (ai_response, specialists), timed_out = cached, []
+            else:
+                ai_response, specialists, timed_out = collect_query_stages(in_flight.pop(index))
+                submit_next()
+                cache_query_result(validation_result, ai_response, specialists, timed_out)
+            item = {
+                'success': True,
+                'data': build_query_data(validation_result, ai_response, specialists, timed_out)
+            }
+            if validation_result['warning_message']:
+                item['warning'] = validation_result['warning_message']
+            results.append(item)
+        
+        logger.info("Batch of %s queries processed", len(queries))
+        return jsonify({'success': True, 'results': results}), 200
+        
+    except Exception as e:
+        logger.error("Batch query API error: %s", e)
         return jsonify({'success': False, 'error': 'Internal server error'}), 500
 
 @app.route('/api/health/validate', methods=['POST'])
@@ -307,23 +679,58 @@ def validate_input_only():
         return jsonify(validation_result), 200
         
     except Exception as e:
-        logger.error(f"Validation endpoint error: {e}")
+        logger.error("Validation endpoint error: %s", e)
         return jsonify({
             'is_valid': False,
             'error_message': 'Validation error occurred'
         }), 500
 
+@app.route('/api/health/validate/batch', methods=['POST'])
+def validate_input_batch():
+    """API endpoint for validating a list of queries in one request"""
+    try:
+        data = request.get_json(silent=True) or {}
+        queries = data.get('queries')
+        
+        if not isinstance(queries, list) or not queries:
+            return jsonify({
+                'success': False,
+                'error': 'Provide a non-empty list of queries'
+            }), 400
+        
+        if len(queries) > MAX_BATCH_SIZE:
+            return jsonify({
+                'success': False,
+                'error': f'Too many queries. Please send at most {MAX_BATCH_SIZE} per batch.'
+            }), 400
+        
+        results = [
+            validator.validate_input(query.strip() if isinstance(query, str) else query)
+            for query in queries
+        ]
+        return jsonify({
+            'success': True,
+            'results': results
+        }), 200
+        
+    except Exception as e:
+        logger.error("Batch validation endpoint error: %s", e)
+        return jsonify({
+            'success': False,
+            'error': 'Validation error occurred'
+        }), 500
+
 @app.route('/api/health/history/<session_id>', methods=['GET'])
 def get_chat_history(session_id):
     """Get chat history for a session"""
     try:
-        history = chat_history.get(session_id, [])
+        history = chat_history.get_history(session_id)
         return jsonify({
             'success': True,
             'history': history
         }), 200
     except Exception as e:
-        logger.error(f"History retrieval error: {e}")
+        logger.error("History retrieval error: %s", e)
         return jsonify({
             'success': False,
             'error': 'Error retrieving chat history'
@@ -333,37 +740,81 @@ def get_chat_history(session_id):
 def get_system_stats():
     """Get system statistics"""
     try:
-        total_sessions = len(chat_history)
-        total_queries = sum(len(history) for history in chat_history.values())
+        session_stats = chat_history.stats()
         
         return jsonify({
             'success': True,
             'stats': {
-                'total_sessions': total_sessions,
-                'total_queries': total_queries,
-                'medical_agent_available': MEDICAL_AGENT_AVAILABLE,
-                'specialist_recommender_available': SPECIALIST_RECOMMENDER_AVAILABLE,
+                'total_sessions': session_stats['total_sessions'],
+                'total_queries': session_stats['total_queries'],
+                'lifetime_queries': session_stats['lifetime_queries'],
+                'evicted_sessions': session_stats['evicted_sessions'],
+                'response_cache': response_cache.stats(),
+                'medical_agent_available': components.available('medical_agent'),
+                'specialist_recommender_available': components.available('specialist_recommender'),
+                'components': components.status(),
+                'cold_start_to_ready_seconds': components.cold_start_seconds,
+                'stage_latency': STAGE_LATENCY.snapshot(),
+                'logging': log_pipeline.stats(),
                 'system_status': 'healthy'
             }
         }), 200
     except Exception as e:
-        logger.error(f"Stats error: {e}")
+        logger.error("Stats error: %s", e)
         return jsonify({
             'success': False,
             'error': 'Error retrieving system stats'
         }), 500
 
+@app.route('/api/health/warmup', methods=['POST'])
+def warmup_components():
+    """Load heavy components now instead of on the first query (admin only)"""
+    if not admin_authorized():
+        return jsonify({'success': False, 'error': 'Not authorized'}), 403
+    
+    data = request.get_json(silent=True) or {}
+    names = data.get('components')
+    
+    if names is not None:
+        if not isinstance(names, list) or not all(isinstance(name, str) for name in names):
+            return jsonify({'success': False, 'error': 'components must be a list of component names'}), 400
+        unknown = [name for name in names if name not in components.status()]
+        if unknown:
+            return jsonify({'success': False, 'error': f"Unknown components: {', '.join(map(str, unknown))}"}), 400
+    
+    status = components.warmup(names)
+    return jsonify({
+        'success': True,
+        'components': status,
+        'cold_start_to_ready_seconds': components.cold_start_seconds
+    }), 200
+
+@app.route('/api/health/cache/invalidate', methods=['POST'])
+def invalidate_response_cache():
+    """Drop cached answers, e.g. after the knowledge base is re-ingested"""
+    if not admin_authorized():
+        return jsonify({'success': False, 'error': 'Not authorized'}), 403
+    
+    removed = response_cache.invalidate()
+    logger.info("Response cache invalidated (%s entries removed)", removed)
+    return jsonify({'success': True, 'removed_entries': removed}), 200
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Request and per-stage latency histograms in Prometheus text format"""
+    return Response(REGISTRY.render(), content_type=PROMETHEUS_CONTENT_TYPE)
+
 @app.errorhandler(404)
 def not_found(error):
     return jsonify({'success': False, 'error': 'Endpoint not found'}), 404
 
 @app.errorhandler(500)
 def internal_error(error):
-    logger.error(f"Internal server error: {error}")
+    logger.error("Internal server error: %s", error)
     return jsonify({'success': False, 'error': 'Internal server error'}), 500
 
 if __name__ == '__main__':
     logger.info("Starting AI Health Chatbot Backend...")
-    logger.info(f"Medical Agent Available: {MEDICAL_AGENT_AVAILABLE}")
-    logger.info(f"Specialist Recommender Available: {SPECIALIST_RECOMMENDER_AVAILABLE}")
+    logger.info("Medical Agent Available: %s", components.available('medical_agent'))
+    logger.info("Specialist Recommender Available: %s", components.available('specialist_recommender'))
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
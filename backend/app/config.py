@@ -3,6 +3,14 @@ from typing import List, Optional
 from pathlib import Path
 import os
 
+def latest_medical_source(data_path: Path) -> str:
+    """The collector's newest output: the .jsonl from streaming runs or the .json from buffered ones"""
+    candidates = [data_path / "medlineplus_structured.jsonl", data_path / "medlineplus_structured.json"]
+    existing = [path for path in candidates if path.exists()]
+    if not existing:
+        return str(candidates[1])
+    return str(max(existing, key=lambda path: path.stat().st_mtime))
+
 class Settings(BaseSettings):
     app_name: str = "Health ChatPal AI Health Assistant"
     version: str = "2.0.0"
@@ -11,19 +19,34 @@ class Settings(BaseSettings):
     # Vector Database
     qdrant_url: str = os.getenv("QDRANT_URL", "http://localhost:6333")
     qdrant_collection_name: str = "medical_knowledge"
+    vector_store_backend: str = "qdrant"  # "qdrant" or "local" (in-process index under cache_path)
+    local_index_type: str = "exact"       # "exact", "ivf" or "hnsw" for the local backend
+    local_quantization: str = "none"      # "none", "float16" or "int8" first-pass vectors for the local backend
+    quantization_rescore_factor: int = 4  # candidates per result rescored at full precision
+    hybrid_alpha: float = 0.5             # dense weight when fusing with BM25 (cache_path/bm25)
     
     # Embeddings
     embedding_model_name: str = "sentence-transformers/all-MiniLM-L6-v2"
     embedding_dimension: int = 384
     embedding_batch_size: int = 32
+    query_batch_max_wait_ms: float = 3.0  # how long a query waits for others to share its forward pass
+    preload_models: List[str] = []  # e.g. ["embedding_model"]; loaded at import for gunicorn --preload
+    embedding_cache_max_entries: int = 200000  # on-disk cache under cache_path/embeddings
+    semantic_cache_threshold: float = 0.92     # cosine similarity needed to reuse a cached answer
+    semantic_cache_max_entries: int = 5000
     
     # API Keys
     google_api_key: Optional[str] = None   # 👈 Added this for Google Generative AI
     groq_api_key: Optional[str] = None     # Keep this in case you use Groq
     
+    # Request profiling (send X-Profile-Token, or sample a fraction of requests)
+    profile_token: Optional[str] = None
+    profile_sample_rate: float = 0.0
+    
     # Chunking
     chunk_size: int = 500
     chunk_overlap: int = 50
+    chunking_strategy: str = "recursive"  # or "section" (section_chunker); a change re-chunks every entry
     
     # File handling
     max_file_size_mb: int = 10
@@ -34,11 +57,13 @@ class Settings(BaseSettings):
     medical_data_path: Path = base_path / "data" / "medical_knowledge"
     logs_path: Path = base_path.parent / "logs"
     cache_path: Path = base_path.parent / "cache"
+    disease_dataset_path: Path = base_path / "data" / "Original_Dataset.csv"
+    disease_description_path: Path = base_path / "data" / "Disease_Description.csv"
+    doctor_disease_path: Path = base_path / "data" / "Doctor_Versus_Disease.csv"
+    local_vector_path: Path = cache_path / "vector_index"
     
     # Medical sources for ingestion
-    medical_sources: List[str] = [
-        str(base_path / "data" / "medical_knowledge" / "medlineplus_structured.json")
-    ]
+    medical_sources: List[str] = [latest_medical_source(base_path / "data" / "medical_knowledge")]
     
     class Config:
         env_file = ".env"
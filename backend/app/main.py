@@ -1,9 +1,25 @@
+import asyncio
 import time
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, Response
+
+from observability.log_pipeline import install_loguru, setup_logging
+from observability.metrics import PROMETHEUS_CONTENT_TYPE, REGISTRY, record_request
+from observability.profiling import PROFILE_HEADER, RequestProfiler
 
 from app.config import settings
+
+# Loguru and stdlib records go through one queue; a background writer batches
+# them into size-rotated JSON lines at logs/rag_system.log
+log_pipeline = setup_logging(settings.logs_path, "rag_system.log")
+install_loguru(log_pipeline, level="DEBUG" if settings.debug else "INFO")
+
+from app.services.rag.model_registry import model_registry
+
+# Under `gunicorn --preload` this runs in the master, so workers share the weights
+model_registry.preload(settings.preload_models)
+
 from app.routers import rag,chat
 from app.routers import air_quality
 from app.routers import outbreak_alert
@@ -23,6 +39,86 @@ app = FastAPI(
     description="AI Health Assistant with RAG-powered medical knowledge"
 )
 
+class MetricsMiddleware:
+    """Pure ASGI middleware feeding the per-route latency histogram.
+
+    Routes are labelled by their path template ("/api/doctors/{id}"), so
+    label cardinality stays bounded; unmatched paths share one label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            record_request(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                status,
+                time.perf_counter() - started,
+            )
+
+
+class ProfilingMiddleware:
+    """Profiles requests selected by RequestProfiler into settings.logs_path/profiles"""
+
+    def __init__(self, app, profiler: RequestProfiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        header = dict(scope["headers"]).get(PROFILE_HEADER.lower().encode(), b"").decode() or None
+        session = self.profiler.start(asyncio.current_task()) if self.profiler.should_profile(header) else None
+        if session is None:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = getattr(scope.get("route"), "path", "unmatched")
+            await asyncio.to_thread(self.profiler.finish, session, scope["method"], route, status)
+
+
+app.add_middleware(MetricsMiddleware)
+
+request_profiler = RequestProfiler(
+    settings.logs_path / "profiles",
+    include_paths=[settings.base_path],
+    token=settings.profile_token,
+    sample_rate=settings.profile_sample_rate,
+)
+# Not installed at all unless a token or sample rate is configured
+if request_profiler.enabled:
+    app.add_middleware(ProfilingMiddleware, profiler=request_profiler)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -54,9 +150,16 @@ async def health_check():
     return {
         "status": "healthy",
         "timestamp": time.time(),
-        "version": settings.version
+        "version": settings.version,
+        "logging": log_pipeline.stats(),
+        "models": model_registry.status()
     }
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Request and per-stage latency histograms in Prometheus text format"""
+    return Response(REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     return JSONResponse(
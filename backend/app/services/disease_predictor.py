@@ -0,0 +1,189 @@
+"""
+Symptom-based disease prediction over a sparse disease-by-symptom matrix.
+
+Original_Dataset.csv is parsed once: symptom names are normalised
+(" dischromic _patches" -> "dischromic_patches") and every disease row set
+is folded into a binary CSR matrix of shape (diseases, symptoms). The matrix
+and both vocabularies are saved as a .npz artifact next to the CSV and
+reloaded by later workers instead of re-parsing the CSV; the artifact is
+rebuilt whenever the CSV changes.
+
+Scores are cosine similarities between the binary query vector and each
+disease row, so a batch of queries is a single sparse matrix product.
+"""
+
+import csv
+import hashlib
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from loguru import logger
+from scipy import sparse
+
+from app.config import settings
+
+ARTIFACT_VERSION = 1
+_SYMPTOM_SEPARATORS = re.compile(r"[\s_]+")
+
+
+def normalize_symptom(symptom: str) -> str:
+    """Canonical symptom key: lower case, words joined by single underscores"""
+    return _SYMPTOM_SEPARATORS.sub("_", symptom.strip().lower()).strip("_")
+
+
+def normalize_disease(disease: str) -> str:
+    """Display name with surrounding and repeated whitespace removed"""
+    return " ".join(disease.split())
+
+
+def _file_digest(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+class DiseasePredictor:
+    def __init__(self, matrix: sparse.csr_matrix, diseases: Sequence[str], symptoms: Sequence[str]):
+        self.matrix = matrix.astype(np.float32)
+        self.diseases = list(diseases)
+        self.symptoms = list(symptoms)
+        self.symptom_index = {symptom: i for i, symptom in enumerate(self.symptoms)}
+        # Per-disease norms of the binary rows, used for cosine scores
+        self._row_norms = np.sqrt(np.asarray(self.matrix.sum(axis=1)).ravel())
+        self._row_norms[self._row_norms == 0] = 1.0
+
+    # ------------------------------------------------------------------ #
+    # Construction
+    # ------------------------------------------------------------------ #
+    @classmethod
+    def from_csv(cls, csv_path: Path) -> "DiseasePredictor":
+        """Parse the dataset and fold all rows into the binary matrix"""
+        disease_symptoms: Dict[str, set] = {}
+        with open(csv_path, newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            for row in reader:
+                if not row or not row[0].strip():
+                    continue
+                symptoms = disease_symptoms.setdefault(normalize_disease(row[0]), set())
+                symptoms.update(normalize_symptom(cell) for cell in row[1:] if cell.strip())
+
+        diseases = sorted(disease_symptoms)
+        symptoms = sorted(set().union(*disease_symptoms.values()))
+        symptom_index = {symptom: i for i, symptom in enumerate(symptoms)}
+
+        rows, cols = [], []
+        for row, disease in enumerate(diseases):
+            for symptom in disease_symptoms[disease]:
+                rows.append(row)
+                cols.append(symptom_index[symptom])
+        matrix = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, cols)),
+            shape=(len(diseases), len(symptoms)),
+        )
+        return cls(matrix, diseases, symptoms)
+
+    @classmethod
+    def load(cls, csv_path: Path = settings.disease_dataset_path,
+             artifact_path: Optional[Path] = None) -> "DiseasePredictor":
+        """Load the .npz artifact, (re)building it from the CSV when missing or stale"""
+        csv_path = Path(csv_path)
+        artifact_path = Path(artifact_path) if artifact_path else csv_path.with_suffix(".symptom_matrix.npz")
+        source_digest = _file_digest(csv_path)
+
+        if artifact_path.exists():
+            with np.load(artifact_path, allow_pickle=False) as artifact:
+                if (int(artifact["version"]) == ARTIFACT_VERSION
+                        and str(artifact["source_digest"]) == source_digest):
+                    matrix = sparse.csr_matrix(
+                        (np.ones(len(artifact["indices"]), dtype=np.float32),
+                         artifact["indices"], artifact["indptr"]),
+                        shape=tuple(artifact["shape"]),
+                    )
+                    return cls(matrix, artifact["diseases"].tolist(), artifact["symptoms"].tolist())
+            logger.info(f"Symptom matrix artifact {artifact_path.name} is stale, rebuilding")
+
+        predictor = cls.from_csv(csv_path)
+        predictor.save(artifact_path, source_digest)
+        logger.info(
+            f"✅ Built symptom matrix ({len(predictor.diseases)} diseases x "
+            f"{len(predictor.symptoms)} symptoms) -> {artifact_path.name}"
+        )
+        return predictor
+
+    def save(self, artifact_path: Path, source_digest: str) -> None:
+        """Write the artifact atomically (binary matrix, so only the CSR structure is stored)"""
+        matrix = self.matrix.tocsr()
+        tmp_path = Path(f"{artifact_path}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                version=np.int32(ARTIFACT_VERSION),
+                source_digest=np.str_(source_digest),
+                indptr=matrix.indptr.astype(np.int32),
+                indices=matrix.indices.astype(np.int32),
+                shape=np.asarray(matrix.shape, dtype=np.int64),
+                diseases=np.asarray(self.diseases, dtype=str),
+                symptoms=np.asarray(self.symptoms, dtype=str),
+            )
+        os.replace(tmp_path, artifact_path)
+
+    # ------------------------------------------------------------------ #
+    # Prediction
+    # ------------------------------------------------------------------ #
+    def predict(self, symptoms: Sequence[str], top_k: int = 5) -> Dict[str, Any]:
+        return self.predict_batch([symptoms], top_k)[0]
+
+    def predict_batch(self, symptom_lists: Sequence[Sequence[str]], top_k: int = 5) -> List[Dict[str, Any]]:
+        """Top-k diseases for every query, computed as one sparse matrix product"""
+        rows, cols, unknown = [], [], []
+        for row, symptoms in enumerate(symptom_lists):
+            missing = []
+            for symptom in {normalize_symptom(symptom) for symptom in symptoms}:
+                col = self.symptom_index.get(symptom)
+                if col is None:
+                    missing.append(symptom)
+                else:
+                    rows.append(row)
+                    cols.append(col)
+            unknown.append(sorted(missing))
+
+        queries = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, cols)),
+            shape=(len(symptom_lists), len(self.symptoms)),
+        )
+        overlap = (queries @ self.matrix.T).toarray()
+        query_norms = np.sqrt(np.asarray(queries.sum(axis=1)).ravel())
+        query_norms[query_norms == 0] = 1.0
+        scores = overlap / query_norms[:, None] / self._row_norms[None, :]
+
+        k = min(top_k, len(self.diseases))
+        results = []
+        for row in range(len(symptom_lists)):
+            top = np.argpartition(-scores[row], k - 1)[:k] if k else np.array([], dtype=int)
+            top = top[np.argsort(-scores[row][top])]
+            results.append({
+                "predictions": [
+                    {
+                        "disease": self.diseases[i],
+                        "score": round(float(scores[row, i]), 4),
+                        "matched_symptoms": int(overlap[row, i]),
+                    }
+                    for i in top
+                    if overlap[row, i] > 0
+                ],
+                "unknown_symptoms": unknown[row],
+            })
+        return results
+
+
+_predictor: Optional[DiseasePredictor] = None
+
+
+def get_disease_predictor() -> DiseasePredictor:
+    """Process-wide predictor loaded from the artifact next to the dataset"""
+    global _predictor
+    if _predictor is None:
+        _predictor = DiseasePredictor.load()
+    return _predictor
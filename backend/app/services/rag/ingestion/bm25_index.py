@@ -0,0 +1,309 @@
+"""
+Persisted BM25 lexical index over the same chunks the ingestion pipeline
+stores in the vector collection.
+
+Postings are kept as flat arrays: for term t, doc_ids[offsets[t]:offsets[t+1]]
+(uint32) and term_freqs[...] (uint16), with per-chunk lengths alongside. The
+arrays are saved as .npy files under settings.cache_path / "bm25" and
+memory-mapped on load; the vocabulary, chunk ids and payloads go to a JSON
+sidecar. Each save writes a new generation of array files and then swaps
+the sidecar that names it, so readers never pair arrays and ids from
+different builds. Exact terms such as drug names ("metformin") or "DASH" are matched
+without touching the embedding model.
+
+HybridRetriever fuses BM25 and dense scores and degrades to lexical-only
+results while the dense side (Qdrant or the embedding model) is failing.
+"""
+
+import json
+import math
+import os
+import re
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+from loguru import logger
+
+from app.config import settings
+from app.services.rag.ingestion.incremental_ingestion import (
+    chunking_config,
+    default_chunker,
+    iter_chunks,
+    iter_entries,
+)
+from observability.metrics import stage_timer
+
+INDEX_VERSION = 2
+_ARRAYS = ("offsets", "doc_ids", "term_freqs", "doc_lengths")
+# Array generations kept on disk (the current one plus older ones that
+# readers may still be opening)
+_KEEP_GENERATIONS = 2
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be but by can do does for from has have how i if in into is it its "
+    "may more most no not of on or our should so such than that the their them then there "
+    "these they this to was were what when where which who will with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased alphanumeric tokens without stopwords"""
+    return [token for token in _TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def _sources_fingerprint(sources: Sequence[str]) -> List[List[Any]]:
+    return [
+        [source, os.path.getsize(source), int(os.path.getmtime(source))]
+        for source in sources if os.path.exists(source)
+    ]
+
+
+class BM25Index:
+    def __init__(self, path: Path = settings.cache_path / "bm25", k1: float = 1.5, b: float = 0.75):
+        self.path = Path(path)
+        self.k1 = k1
+        self.b = b
+        self.terms: Dict[str, int] = {}
+        self.ids: List[Any] = []
+        self.payloads: List[Dict[str, Any]] = []
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.doc_ids = np.empty(0, dtype=np.uint32)
+        self.term_freqs = np.empty(0, dtype=np.uint16)
+        self.doc_lengths = np.empty(0, dtype=np.uint32)
+        self.sources: List[List[Any]] = []
+        self.chunking: Dict[str, Any] = {}
+
+    # ------------------------------------------------------------------ #
+    # Building and persistence
+    # ------------------------------------------------------------------ #
+    def build(self, points: Iterable[tuple]) -> "BM25Index":
+        """Index (point_id, chunk, payload) triples as produced by iter_chunks"""
+        postings: Dict[str, List[tuple]] = {}
+        ids, payloads, lengths = [], [], []
+        for point_id, chunk, payload in points:
+            doc = len(ids)
+            tokens = tokenize(chunk)
+            for term, freq in Counter(tokens).items():
+                postings.setdefault(term, []).append((doc, min(freq, 65535)))
+            ids.append(point_id)
+            payloads.append(payload)
+            lengths.append(len(tokens))
+
+        vocabulary = sorted(postings)
+        self.terms = {term: i for i, term in enumerate(vocabulary)}
+        sizes = np.fromiter((len(postings[term]) for term in vocabulary), dtype=np.int64, count=len(vocabulary))
+        self.offsets = np.concatenate(([0], np.cumsum(sizes))).astype(np.int64)
+        flat = [posting for term in vocabulary for posting in postings[term]]
+        self.doc_ids = np.fromiter((doc for doc, _ in flat), dtype=np.uint32, count=len(flat))
+        self.term_freqs = np.fromiter((freq for _, freq in flat), dtype=np.uint16, count=len(flat))
+        self.doc_lengths = np.asarray(lengths, dtype=np.uint32)
+        self.ids = ids
+        self.payloads = payloads
+        return self
+
+    def save(self) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        generation = uuid.uuid4().hex[:12]
+        for name in _ARRAYS:
+            np.save(self.path / f"{name}.{generation}.npy", getattr(self, name))
+        meta = {
+            "version": INDEX_VERSION,
+            "generation": generation,
+            "k1": self.k1,
+            "b": self.b,
+            "sources": self.sources,
+            "chunking": self.chunking,
+            "terms": sorted(self.terms, key=self.terms.get),
+            "ids": self.ids,
+            "payloads": self.payloads,
+        }
+        tmp_path = self.path / f"meta.json.{generation}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        # The sidecar is replaced last, so a reader never sees it ahead of its arrays
+        os.replace(tmp_path, self.path / "meta.json")
+        self._remove_old_generations(generation)
+
+    def _remove_old_generations(self, current: str) -> None:
+        generations: Dict[str, float] = {}
+        for file in self.path.glob("*.npy"):
+            parts = file.name.split(".")
+            generation = parts[1] if len(parts) == 3 else ""
+            try:
+                generations[generation] = max(generations.get(generation, 0.0), file.stat().st_mtime)
+            except FileNotFoundError:
+                continue
+        newest = sorted(generations, key=generations.get, reverse=True)[:_KEEP_GENERATIONS]
+        for file in self.path.glob("*.npy"):
+            parts = file.name.split(".")
+            generation = parts[1] if len(parts) == 3 else ""
+            if generation != current and generation not in newest:
+                file.unlink(missing_ok=True)
+
+    @classmethod
+    def load(cls, path: Path = settings.cache_path / "bm25") -> Optional["BM25Index"]:
+        """Memory-map a saved index; None if there is none (or it is from another version)"""
+        path = Path(path)
+        for _ in range(3):
+            if not (path / "meta.json").exists():
+                return None
+            with open(path / "meta.json", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("version") != INDEX_VERSION:
+                return None
+            try:
+                arrays = {
+                    name: np.load(path / f"{name}.{meta['generation']}.npy", mmap_mode="r") for name in _ARRAYS
+                }
+            except FileNotFoundError:
+                # Concurrent saves retired this generation; read the new sidecar
+                continue
+            index = cls(path, meta["k1"], meta["b"])
+            index.terms = {term: i for i, term in enumerate(meta["terms"])}
+            index.ids = meta["ids"]
+            index.payloads = meta["payloads"]
+            index.sources = meta["sources"]
+            index.chunking = meta.get("chunking", {})
+            for name, array in arrays.items():
+                setattr(index, name, array)
+            return index
+        return None
+
+    def count(self) -> int:
+        return len(self.ids)
+
+    # ------------------------------------------------------------------ #
+    # Search
+    # ------------------------------------------------------------------ #
+    def search(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """Return up to `limit` chunks as {"id", "score", "payload"}, best first"""
+        total = len(self.ids)
+        if not total or limit <= 0:
+            return []
+
+        average_length = float(self.doc_lengths.mean()) or 1.0
+        length_norm = self.k1 * (1 - self.b + self.b * self.doc_lengths / average_length)
+        scores = np.zeros(total, dtype=np.float32)
+        for term in set(tokenize(query)):
+            position = self.terms.get(term)
+            if position is None:
+                continue
+            start, end = self.offsets[position], self.offsets[position + 1]
+            docs = self.doc_ids[start:end]
+            freqs = self.term_freqs[start:end].astype(np.float32)
+            idf = math.log(1 + (total - len(docs) + 0.5) / (len(docs) + 0.5))
+            scores[docs] += idf * freqs * (self.k1 + 1) / (freqs + length_norm[docs])
+
+        matched = np.flatnonzero(scores)
+        if not len(matched):
+            return []
+        k = min(limit, len(matched))
+        top = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+        top = top[np.argsort(-scores[top])]
+        return [{"id": self.ids[row], "score": float(scores[row]), "payload": self.payloads[row]} for row in top]
+
+
+def build_bm25_index(
+    sources: Sequence[str] = settings.medical_sources,
+    chunk_text: Optional[Callable[[str], List[str]]] = None,
+    path: Path = settings.cache_path / "bm25",
+) -> BM25Index:
+    """Chunk the knowledge base exactly like ingestion does and persist a BM25 index"""
+    chunk_text = chunk_text or default_chunker()
+    started = time.perf_counter()
+    index = BM25Index(path).build(iter_chunks(iter_entries(sources), chunk_text))
+    index.sources = _sources_fingerprint(sources)
+    index.chunking = chunking_config(chunk_text)
+    index.save()
+    logger.info(
+        f"✅ BM25 index built: {index.count()} chunks, {len(index.terms)} terms "
+        f"in {time.perf_counter() - started:.2f}s"
+    )
+    return index
+
+
+class HybridRetriever:
+    """Weighted fusion of BM25 and dense scores with a lexical fallback.
+
+    `dense_search(query, limit)` returns {"id", "score", "payload"} dicts, e.g.
+    a Qdrant or LocalVectorStore search over embed_query(query). When it
+    raises, results come from BM25 alone and the dense side is skipped for
+    `retry_after` seconds instead of paying its failure on every query.
+    """
+
+    def __init__(
+        self,
+        lexical: BM25Index,
+        dense_search: Optional[Callable[[str, int], List[Dict[str, Any]]]] = None,
+        alpha: float = settings.hybrid_alpha,
+        candidates: int = 20,
+        retry_after: float = 30.0,
+    ):
+        self.lexical = lexical
+        self.dense_search = dense_search
+        self.alpha = alpha
+        self.candidates = candidates
+        self.retry_after = retry_after
+        self._dense_down_until = 0.0
+
+    @stage_timer("retrieval")
+    def retrieve(self, query: str, limit: int = 5, mode: str = "hybrid") -> Dict[str, Any]:
+        """Results for `mode` "hybrid", "dense" or "lexical", plus the mode actually served"""
+        dense = None
+        if mode != "lexical":
+            dense = self._dense(query, max(limit, self.candidates))
+        if dense is None:
+            return {"mode": "lexical", "degraded": mode != "lexical", "results": self.lexical.search(query, limit)}
+        if mode == "dense":
+            return {"mode": "dense", "degraded": False, "results": dense[:limit]}
+
+        lexical = self.lexical.search(query, max(limit, self.candidates))
+        return {"mode": "hybrid", "degraded": False, "results": self._fuse(lexical, dense, limit)}
+
+    def _dense(self, query: str, limit: int) -> Optional[List[Dict[str, Any]]]:
+        if self.dense_search is None or time.monotonic() < self._dense_down_until:
+            return None
+        try:
+            return self.dense_search(query, limit)
+        except Exception as e:
+            self._dense_down_until = time.monotonic() + self.retry_after
+            logger.warning(f"⚠️ Dense retrieval unavailable, serving BM25 only for {self.retry_after:.0f}s: {e}")
+            return None
+
+    def _fuse(self, lexical: List[Dict[str, Any]], dense: List[Dict[str, Any]], limit: int) -> List[Dict[str, Any]]:
+        """Min-max normalise each list, then alpha * dense + (1 - alpha) * lexical"""
+        fused: Dict[Any, Dict[str, Any]] = {}
+        for weight, key, results in ((self.alpha, "dense_score", dense), (1 - self.alpha, "lexical_score", lexical)):
+            if not results:
+                continue
+            scores = [result["score"] for result in results]
+            low, span = min(scores), max(scores) - min(scores)
+            for result in results:
+                item = fused.setdefault(
+                    result["id"],
+                    {"id": result["id"], "score": 0.0, "payload": result["payload"],
+                     "dense_score": None, "lexical_score": None},
+                )
+                item[key] = result["score"]
+                item["score"] += weight * ((result["score"] - low) / span if span else 1.0)
+        return sorted(fused.values(), key=lambda item: -item["score"])[:limit]
+
+
+_bm25_index: Optional[BM25Index] = None
+
+
+def get_bm25_index() -> BM25Index:
+    """Process-wide index, rebuilt when the medical sources or the chunking have changed since it was saved"""
+    global _bm25_index
+    if _bm25_index is None:
+        index = BM25Index.load()
+        chunk_text = default_chunker()
+        if index is None or index.sources != _sources_fingerprint(settings.medical_sources) \
+                or index.chunking != chunking_config(chunk_text):
+            index = build_bm25_index(chunk_text=chunk_text)
+        _bm25_index = index
+    return _bm25_index
@@ -0,0 +1,281 @@
+"""
+Persistent, content-addressed embedding cache.
+
+Each vector is keyed by sha256(model name, text) and appended as raw float32
+bytes to `vectors.bin`; `index.bin` is an append-only log of
+(digest, row) records that is replayed into memory on start-up. Re-ingesting
+an unchanged corpus therefore needs no model forward passes, and repeated
+query strings skip the model at retrieval time too.
+
+Several processes (API workers, the ingestion pipeline) may share one cache:
+writes hold an exclusive flock on `lock`, take their rows from the end of
+`vectors.bin` and first replay index records appended by other processes,
+reopening both files if another process compacted them. Reads need no lock;
+entries another process wrote become visible after this process's next
+write.
+"""
+
+import hashlib
+import json
+import os
+import struct
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+from loguru import logger
+
+from app.config import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking, keep to one writer process
+    fcntl = None
+
+_INDEX_RECORD = struct.Struct("<32sQ")
+
+
+def embedding_key(model_name: str, text: str) -> bytes:
+    """Content address of one (model, text) pair"""
+    return hashlib.sha256(model_name.encode("utf-8") + b"\0" + text.encode("utf-8")).digest()
+
+
+class EmbeddingCache:
+    def __init__(
+        self,
+        path: Path = settings.cache_path / "embeddings",
+        dimension: int = settings.embedding_dimension,
+        max_entries: int = settings.embedding_cache_max_entries,
+    ):
+        self.path = Path(path)
+        self.dimension = dimension
+        self.max_entries = max_entries
+        self._row_bytes = dimension * 4
+        self._lock = threading.Lock()
+        # digest -> row, in least-recently-used order
+        self._rows: "OrderedDict[bytes, int]" = OrderedDict()
+        self._next_row = 0
+        # Bytes of index.bin replayed so far, and its inode (changes on compaction)
+        self._index_offset = 0
+        self._index_inode = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._lock_file = open(self.path / "lock", "a+b")
+        with self._writer_lock():
+            self._load()
+            self._open_files()
+
+    @property
+    def vectors_path(self) -> Path:
+        return self.path / "vectors.bin"
+
+    @property
+    def index_path(self) -> Path:
+        return self.path / "index.bin"
+
+    @property
+    def meta_path(self) -> Path:
+        return self.path / "meta.json"
+
+    def get_many(self, keys: Sequence[bytes]) -> List[Optional[np.ndarray]]:
+        """Cached vectors for `keys` (None for misses), in the same order"""
+        results: List[Optional[np.ndarray]] = []
+        with self._lock:
+            for key in keys:
+                row = self._rows.get(key)
+                if row is None:
+                    self.misses += 1
+                    results.append(None)
+                    continue
+                self._rows.move_to_end(key)
+                self.hits += 1
+                self._vectors_file.seek(row * self._row_bytes)
+                results.append(np.frombuffer(self._vectors_file.read(self._row_bytes), dtype=np.float32))
+        return results
+
+    def put_many(self, keys: Sequence[bytes], vectors: Sequence[Sequence[float]]) -> None:
+        """Append new vectors; keys already present are left untouched"""
+        matrix = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dimension)
+        with self._lock, self._writer_lock():
+            self._sync()
+            # Rows follow the real end of the file, not the index
+            self._next_row = self._vectors_file.seek(0, os.SEEK_END) // self._row_bytes
+            index_records = []
+            for key, vector in zip(keys, matrix):
+                if key in self._rows:
+                    continue
+                self._vectors_file.write(vector.tobytes())
+                index_records.append(_INDEX_RECORD.pack(key, self._next_row))
+                self._rows[key] = self._next_row
+                self._next_row += 1
+            self._vectors_file.flush()
+            self._index_file.write(b"".join(index_records))
+            self._index_file.flush()
+            self._index_offset += len(index_records) * _INDEX_RECORD.size
+
+            if len(self._rows) > self.max_entries:
+                self._compact()
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._rows),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "size_bytes": self._next_row * self._row_bytes,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._vectors_file.close()
+            self._index_file.close()
+            self._lock_file.close()
+
+    @contextmanager
+    def _writer_lock(self):
+        """Exclusive across processes sharing this cache directory"""
+        if fcntl is None:
+            yield
+            return
+        fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _open_files(self) -> None:
+        self._vectors_file = open(self.vectors_path, "a+b")
+        self._index_file = open(self.index_path, "ab")
+        self._index_inode = os.fstat(self._index_file.fileno()).st_ino
+
+    def _sync(self) -> None:
+        """Replay index records other processes appended, or reload after their compaction"""
+        stat = os.stat(self.index_path)
+        if stat.st_ino != self._index_inode:
+            self._vectors_file.close()
+            self._index_file.close()
+            self._rows.clear()
+            self._load()
+            self._open_files()
+            return
+        if stat.st_size > self._index_offset:
+            with open(self.index_path, "rb") as f:
+                f.seek(self._index_offset)
+                data = f.read(stat.st_size - self._index_offset)
+            usable = len(data) - len(data) % _INDEX_RECORD.size
+            for key, row in _INDEX_RECORD.iter_unpack(data[:usable]):
+                self._rows[key] = row
+            self._index_offset += usable
+
+    def _load(self) -> None:
+        if self.meta_path.exists():
+            with open(self.meta_path, encoding="utf-8") as f:
+                if json.load(f)["dimension"] != self.dimension:
+                    logger.warning(f"Embedding cache at {self.path} has a different dimension, discarding it")
+                    self.vectors_path.unlink(missing_ok=True)
+                    self.index_path.unlink(missing_ok=True)
+        with open(self.meta_path, "w", encoding="utf-8") as f:
+            json.dump({"dimension": self.dimension}, f)
+
+        complete_rows = self.vectors_path.stat().st_size // self._row_bytes if self.vectors_path.exists() else 0
+        data = self.index_path.read_bytes() if self.index_path.exists() else b""
+        usable = len(data) - len(data) % _INDEX_RECORD.size
+        for key, row in _INDEX_RECORD.iter_unpack(data[:usable]):
+            # Ignore records whose vector never made it to disk (crash mid-append)
+            if row < complete_rows:
+                self._rows[key] = row
+        if usable != len(data):
+            os.truncate(self.index_path, usable)
+        self._index_offset = usable
+        self._next_row = max(self._rows.values(), default=-1) + 1
+        # Drop vectors appended without an index record (crash between the two
+        # writes), so later appends get the rows their index records point at
+        if self.vectors_path.exists() and self.vectors_path.stat().st_size != self._next_row * self._row_bytes:
+            os.truncate(self.vectors_path, self._next_row * self._row_bytes)
+        if self._rows:
+            logger.info(f"Loaded embedding cache with {len(self._rows)} entries from {self.path}")
+
+    def _compact(self) -> None:
+        """Evict least recently used entries down to 80% of capacity by rewriting both files"""
+        keep = list(self._rows.keys())[len(self._rows) - int(self.max_entries * 0.8):]
+        self.evictions += len(self._rows) - len(keep)
+
+        tmp_vectors = self.vectors_path.with_suffix(".bin.tmp")
+        tmp_index = self.index_path.with_suffix(".bin.tmp")
+        rows: "OrderedDict[bytes, int]" = OrderedDict()
+        with open(tmp_vectors, "wb") as vectors_out, open(tmp_index, "wb") as index_out:
+            for new_row, key in enumerate(keep):
+                self._vectors_file.seek(self._rows[key] * self._row_bytes)
+                vectors_out.write(self._vectors_file.read(self._row_bytes))
+                index_out.write(_INDEX_RECORD.pack(key, new_row))
+                rows[key] = new_row
+
+        self._vectors_file.close()
+        self._index_file.close()
+        os.replace(tmp_vectors, self.vectors_path)
+        os.replace(tmp_index, self.index_path)
+        self._open_files()
+        self._index_offset = len(rows) * _INDEX_RECORD.size
+        self._rows = rows
+        self._next_row = len(rows)
+        logger.info(f"Compacted embedding cache to {len(rows)} entries")
+
+
+class CachedEmbeddings:
+    """Wraps a batch encode function with the on-disk cache.
+
+    Exposes the LangChain `Embeddings` surface (embed_documents/embed_query),
+    so it can stand in for the HuggingFace embeddings used by the retriever.
+    Only cache misses are sent to `encode`, in one batch.
+    """
+
+    def __init__(
+        self,
+        encode: Callable[[List[str]], Sequence[Sequence[float]]],
+        model_name: str = settings.embedding_model_name,
+        cache: Optional[EmbeddingCache] = None,
+    ):
+        self.encode = encode
+        self.model_name = model_name
+        self.cache = cache if cache is not None else get_embedding_cache()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [embedding_key(self.model_name, text) for text in texts]
+        vectors = self.cache.get_many(keys)
+
+        # Encode each distinct missing text once
+        missing: Dict[bytes, List[int]] = {}
+        for i, vector in enumerate(vectors):
+            if vector is None:
+                missing.setdefault(keys[i], []).append(i)
+        if missing:
+            first = [positions[0] for positions in missing.values()]
+            computed = np.asarray(self.encode([texts[i] for i in first]), dtype=np.float32)
+            self.cache.put_many(list(missing), computed)
+            for positions, vector in zip(missing.values(), computed):
+                for i in positions:
+                    vectors[i] = vector
+
+        return [vector.tolist() for vector in vectors]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+_embedding_cache: Optional[EmbeddingCache] = None
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Process-wide cache under settings.cache_path"""
+    global _embedding_cache
+    if _embedding_cache is None:
+        _embedding_cache = EmbeddingCache()
+    return _embedding_cache
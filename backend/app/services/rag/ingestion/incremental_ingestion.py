@@ -0,0 +1,252 @@
+"""
+Incremental re-ingestion driven by per-entry content hashes.
+
+A manifest under settings.cache_path records, for every knowledge-base entry,
+a stable id (source URL or source + condition), a hash of its content and the
+ids of the chunks it produced. A refresh only chunks, embeds and upserts new
+or changed entries and deletes the vectors of changed or removed ones, so the
+collection stays queryable while it is updated.
+"""
+
+import hashlib
+import json
+import os
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from loguru import logger
+
+from app.config import settings
+
+
+def entry_id(entry: Dict[str, Any]) -> str:
+    """Stable identity of an entry across refreshes"""
+    origin = entry.get("source_url") or entry.get("source", "")
+    return hashlib.sha1(f"{origin}|{entry.get('condition', '')}".encode("utf-8")).hexdigest()[:16]
+
+
+def content_hash(entry: Dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(entry, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def chunk_point_id(entry_key: str, chunk_index: int) -> str:
+    """Deterministic UUID accepted by both Qdrant and the local store"""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{entry_key}:{chunk_index}"))
+
+
+def iter_entries(sources: Sequence[str] = settings.medical_sources) -> Iterator[Dict[str, Any]]:
+    """Yield structured entries from the sources listed in settings.
+
+    `.jsonl` sources (the collector's streaming output) are read one line at
+    a time; `.json` sources are parsed whole.
+    """
+    for source in sources:
+        if not os.path.exists(source):
+            logger.warning(f"File not found: {source}")
+            continue
+        with open(source, encoding="utf-8") as f:
+            if source.endswith(".jsonl"):
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+            else:
+                yield from json.load(f)
+
+
+def load_entries(sources: Sequence[str] = settings.medical_sources) -> List[Dict[str, Any]]:
+    """Read all structured entries into a list"""
+    return list(iter_entries(sources))
+
+
+def default_chunker() -> Callable[[str], List[str]]:
+    if settings.chunking_strategy == "section":
+        from app.services.rag.ingestion.section_chunker import SectionChunker
+
+        return SectionChunker()
+
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=settings.chunk_size, chunk_overlap=settings.chunk_overlap
+    )
+    return splitter.split_text
+
+
+def chunking_config(chunk_text: Callable[[str], List[str]]) -> Dict[str, Any]:
+    """What decides chunk boundaries; stored with the manifest and the BM25 index
+    so that changing it re-chunks everything"""
+    config = getattr(chunk_text, "config", None)
+    if config is not None:
+        return dict(config)
+    # LangChain splitters are passed as their bound split_text
+    splitter = getattr(chunk_text, "__self__", None)
+    if splitter is not None and hasattr(splitter, "_chunk_size"):
+        return {
+            "strategy": type(splitter).__name__,
+            "chunk_size": splitter._chunk_size,
+            "chunk_overlap": splitter._chunk_overlap,
+        }
+    return {"strategy": getattr(chunk_text, "__qualname__", type(chunk_text).__name__)}
+
+
+def chunk_entry(
+    entry: Dict[str, Any],
+    chunk_text: Callable[[str], List[str]],
+    key: Optional[str] = None,
+) -> List[tuple]:
+    """Split an entry into (point_id, chunk, payload) triples, as stored in the collection"""
+    if hasattr(chunk_text, "chunk_entry"):
+        # Entry-aware chunkers (SectionChunker) build their own payload metadata
+        return chunk_text.chunk_entry(entry, key)
+    key = key or entry_id(entry)
+    text = f"MEDICAL CONDITION: {entry.get('condition', '')}\n\n{entry.get('content', '')}"
+    chunks = [chunk for chunk in chunk_text(text) if chunk.strip()]
+    metadata = {
+        "entry_id": key,
+        "condition": entry.get("condition", ""),
+        "source": entry.get("source", ""),
+        "source_url": entry.get("source_url", ""),
+        "category": entry.get("category", "general"),
+    }
+    return [
+        (chunk_point_id(key, i), chunk, {"page_content": chunk, "metadata": {**metadata, "chunk_index": i}})
+        for i, chunk in enumerate(chunks)
+    ]
+
+
+def iter_chunks(
+    entries: Iterable[Dict[str, Any]],
+    chunk_text: Callable[[str], List[str]],
+) -> Iterator[tuple]:
+    """Chunk every distinct entry (first occurrence wins, as in refresh())"""
+    seen = set()
+    for entry in entries:
+        key = entry_id(entry)
+        if key not in seen:
+            seen.add(key)
+            yield from chunk_entry(entry, chunk_text, key)
+
+
+class IncrementalIngestor:
+    """Applies corpus deltas to a vector store exposing upsert(ids, vectors, payloads) and delete(ids)"""
+
+    def __init__(
+        self,
+        store: Any,
+        embed_documents: Callable[[List[str]], Sequence[Sequence[float]]],
+        chunk_text: Optional[Callable[[str], List[str]]] = None,
+        manifest_path: Path = settings.cache_path / "ingestion_manifest.json",
+        upsert_batch_size: int = 256,
+    ):
+        self.store = store
+        self.embed_documents = embed_documents
+        self.chunk_text = chunk_text or default_chunker()
+        self.chunking = chunking_config(self.chunk_text)
+        self.manifest_path = Path(manifest_path)
+        self.upsert_batch_size = upsert_batch_size
+        self._pending: List[tuple] = []
+        # Bumped whenever a refresh changes the collection; caches key on it
+        self.collection_version = 0
+        self.manifest: Dict[str, Dict[str, Any]] = self._load_manifest()
+
+    def refresh(self, entries: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+        """Bring the store in line with `entries`; returns counts per change type"""
+        current: Dict[str, Dict[str, Any]] = {}
+        duplicates = 0
+        for entry in entries:
+            key = entry_id(entry)
+            if key in current:
+                duplicates += 1
+                continue
+            current[key] = entry
+
+        summary = {"added": 0, "changed": 0, "removed": 0, "unchanged": 0, "duplicates": duplicates,
+                   "chunks_upserted": 0, "chunks_deleted": 0}
+        if not current and self.manifest:
+            # A missing or empty source file must not wipe the collection
+            logger.warning("No entries to ingest, keeping the existing collection untouched")
+            return summary
+        new_manifest: Dict[str, Dict[str, Any]] = {}
+        stale_ids: List[str] = []
+
+        for key, entry in current.items():
+            digest = content_hash(entry)
+            previous = self.manifest.get(key)
+            if previous is not None and previous["content_hash"] == digest:
+                new_manifest[key] = previous
+                summary["unchanged"] += 1
+                continue
+
+            chunk_ids = self._queue_entry(key, entry)
+            summary["chunks_upserted"] += len(chunk_ids)
+            summary["changed" if previous is not None else "added"] += 1
+            if previous is not None:
+                stale_ids.extend(set(previous["chunk_ids"]) - set(chunk_ids))
+            new_manifest[key] = {
+                "content_hash": digest,
+                "condition": entry.get("condition", ""),
+                "chunk_ids": chunk_ids,
+            }
+
+        self._flush()
+
+        for key, previous in self.manifest.items():
+            if key not in current:
+                stale_ids.extend(previous["chunk_ids"])
+                summary["removed"] += 1
+
+        # Delete only after the replacements are in place
+        if stale_ids:
+            self.store.delete(stale_ids)
+            summary["chunks_deleted"] = len(stale_ids)
+
+        self.manifest = new_manifest
+        if summary["added"] or summary["changed"] or summary["removed"]:
+            self.collection_version += 1
+        self._save_manifest()
+        logger.info(f"🔄 Incremental ingestion finished: {summary}")
+        return summary
+
+    def _queue_entry(self, key: str, entry: Dict[str, Any]) -> List[str]:
+        """Chunk an entry and queue its chunks for batched embedding + upsert"""
+        points = chunk_entry(entry, self.chunk_text, key)
+        self._pending.extend(points)
+        if len(self._pending) >= self.upsert_batch_size:
+            self._flush()
+        return [point_id for point_id, _, _ in points]
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        point_ids, chunks, payloads = zip(*self._pending)
+        self._pending = []
+        self.store.upsert(list(point_ids), self.embed_documents(list(chunks)), list(payloads))
+
+    def _load_manifest(self) -> Dict[str, Dict[str, Any]]:
+        if not self.manifest_path.exists():
+            return {}
+        with open(self.manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        self.collection_version = manifest.get("collection_version", 0)
+        entries = manifest["entries"]
+        if entries and manifest.get("chunking") != self.chunking:
+            # Chunked differently: treat every entry as changed, so it is re-chunked
+            # and its old chunk ids are deleted on the next refresh
+            logger.warning(
+                f"Chunking changed from {manifest.get('chunking')} to {self.chunking}, re-chunking all entries"
+            )
+            for entry in entries.values():
+                entry["content_hash"] = None
+        return entries
+
+    def _save_manifest(self) -> None:
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"version": 1, "collection_version": self.collection_version, "chunking": self.chunking,
+                 "entries": self.manifest},
+                f, ensure_ascii=False,
+            )
+        os.replace(tmp_path, self.manifest_path)
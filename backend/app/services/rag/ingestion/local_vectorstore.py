@@ -0,0 +1,428 @@
+"""
+Embedded, in-process vector store used instead of Qdrant when
+settings.vector_store_backend == "local".
+
+Vectors are L2-normalised float32 rows of a memory-mapped .npy matrix, with
+ids and payloads in a JSON sidecar, so scores are cosine similarities just
+like the Qdrant collection. Each save writes a new generation of the matrix
+(and quantized codes) and then swaps the sidecar that names it, so a reader
+never pairs vectors with ids or codes from another save. Search is exact below `ann_threshold` vectors and
+uses an IVF (NumPy) or HNSW (faiss-cpu) index above it.
+
+With `quantization` set to "float16" or "int8" (per-dimension scales), exact
+and IVF search scan a compact in-memory copy of the vectors and rescore the
+best `limit * rescore_factor` candidates against the memory-mapped float32
+rows, so returned scores are still full-precision cosines.
+"""
+
+import json
+import os
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+from loguru import logger
+
+from app.config import settings
+
+INDEX_TYPES = ("exact", "ivf", "hnsw")
+QUANTIZATION_TYPES = ("none", "float16", "int8")
+
+# Rows converted to float32 at a time when scanning quantized vectors (kept cache-sized)
+_SCAN_BLOCK = 2048
+# Generations kept on disk (the current one plus an older one readers may still be opening)
+_KEEP_GENERATIONS = 2
+
+
+class LocalVectorStore:
+    def __init__(
+        self,
+        path: Path,
+        dimension: int = settings.embedding_dimension,
+        index_type: str = settings.local_index_type,
+        ann_threshold: int = 20000,
+        nprobe: int = 8,
+        hnsw_m: int = 32,
+        hnsw_ef_search: int = 64,
+        autosave: bool = True,
+        quantization: str = settings.local_quantization,
+        rescore_factor: int = settings.quantization_rescore_factor,
+    ):
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"Unknown index type '{index_type}', expected one of {INDEX_TYPES}")
+        if quantization not in QUANTIZATION_TYPES:
+            raise ValueError(f"Unknown quantization '{quantization}', expected one of {QUANTIZATION_TYPES}")
+
+        self.path = Path(path)
+        self.dimension = dimension
+        self.index_type = index_type
+        self.ann_threshold = ann_threshold
+        self.nprobe = nprobe
+        self.hnsw_m = hnsw_m
+        self.hnsw_ef_search = hnsw_ef_search
+        self.autosave = autosave
+        self.quantization = quantization
+        self.rescore_factor = max(1, rescore_factor)
+
+        self._vectors = np.empty((0, dimension), dtype=np.float32)
+        self._writable = True
+        self._ids: List[Any] = []
+        self._payloads: List[Dict[str, Any]] = []
+        self._row_of: Dict[Any, int] = {}
+        self._ann = None
+        self._codes: Optional[np.ndarray] = None
+        self._scales: Optional[np.ndarray] = None
+        self._generation: Optional[str] = None
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._load()
+
+    @property
+    def vectors_file(self) -> Path:
+        return self._generation_file("embeddings", ".npy", self._generation)
+
+    @property
+    def metadata_file(self) -> Path:
+        return self.path / "metadata.json"
+
+    @property
+    def codes_file(self) -> Path:
+        return self._generation_file("codes", ".npz", self._generation)
+
+    # ------------------------------------------------------------------ #
+    # Collection management
+    # ------------------------------------------------------------------ #
+    def create_collection(self, recreate: bool = False) -> None:
+        """Create an empty collection (or wipe the existing one when recreate=True)"""
+        if recreate or not self.metadata_file.exists():
+            logger.info(f"Creating local vector collection at {self.path}")
+            self._vectors = np.empty((0, self.dimension), dtype=np.float32)
+            self._writable = True
+            self._ids, self._payloads, self._row_of = [], [], {}
+            self._ann = None
+            self._codes = None
+            self.save()
+
+    def count(self) -> int:
+        return len(self._ids)
+
+    def memory_footprint(self) -> Dict[str, Any]:
+        """Bytes of the float32 matrix and of the compact copy scanned by search"""
+        footprint = {
+            "quantization": self.quantization,
+            "vectors_bytes": len(self._ids) * self.dimension * 4,
+            "codes_bytes": 0,
+        }
+        if self.quantization != "none" and self._ids:
+            codes, scales = self._quantized()
+            footprint["codes_bytes"] = codes.nbytes + (scales.nbytes if scales is not None else 0)
+        return footprint
+
+    # ------------------------------------------------------------------ #
+    # Writes
+    # ------------------------------------------------------------------ #
+    def upsert(
+        self,
+        ids: Sequence[Any],
+        vectors: Sequence[Sequence[float]],
+        payloads: Optional[Sequence[Dict[str, Any]]] = None,
+    ) -> int:
+        """Insert or replace points; returns the number of points written"""
+        matrix = self._normalise(np.asarray(vectors, dtype=np.float32).reshape(-1, self.dimension))
+        if len(ids) != len(matrix):
+            raise ValueError("ids and vectors must have the same length")
+        payloads = list(payloads) if payloads is not None else [{} for _ in ids]
+
+        self._ensure_writable()
+        new_rows, new_ids, new_payloads = [], [], []
+        for point_id, vector, payload in zip(ids, matrix, payloads):
+            row = self._row_of.get(point_id)
+            if row is not None and row >= len(self._ids):
+                # Repeated id within this batch: replace the pending row
+                new_rows[row - len(self._ids)] = vector
+                new_payloads[row - len(self._ids)] = payload
+            elif row is not None:
+                self._vectors[row] = vector
+                self._payloads[row] = payload
+            else:
+                self._row_of[point_id] = len(self._ids) + len(new_ids)
+                new_rows.append(vector)
+                new_ids.append(point_id)
+                new_payloads.append(payload)
+
+        if new_rows:
+            self._vectors = np.vstack([self._vectors, np.stack(new_rows)])
+            self._ids.extend(new_ids)
+            self._payloads.extend(new_payloads)
+
+        self._ann = None
+        self._codes = None
+        if self.autosave:
+            self.save()
+        return len(matrix)
+
+    def delete(self, ids: Iterable[Any]) -> int:
+        """Remove points by id; returns the number of points removed"""
+        rows = sorted({self._row_of[point_id] for point_id in ids if point_id in self._row_of})
+        if not rows:
+            return 0
+
+        self._ensure_writable()
+        keep = np.ones(len(self._ids), dtype=bool)
+        keep[rows] = False
+        self._vectors = self._vectors[keep]
+        self._ids = [point_id for point_id, kept in zip(self._ids, keep) if kept]
+        self._payloads = [payload for payload, kept in zip(self._payloads, keep) if kept]
+        self._row_of = {point_id: row for row, point_id in enumerate(self._ids)}
+
+        self._ann = None
+        self._codes = None
+        if self.autosave:
+            self.save()
+        return len(rows)
+
+    def save(self) -> None:
+        """Write a new generation of the matrix and codes, swap in its sidecar, then re-map the matrix"""
+        generation = uuid.uuid4().hex[:12]
+        with open(self._generation_file("embeddings", ".npy", generation), "wb") as f:
+            np.save(f, np.ascontiguousarray(self._vectors, dtype=np.float32))
+
+        if self.quantization != "none":
+            codes, scales = self._quantized()
+            with open(self._generation_file("codes", ".npz", generation), "wb") as f:
+                np.savez(f, quantization=self.quantization, codes=codes,
+                         scales=scales if scales is not None else np.empty(0, dtype=np.float32))
+
+        tmp_metadata = self.path / f"metadata.json.{generation}.tmp"
+        with open(tmp_metadata, "w", encoding="utf-8") as f:
+            json.dump(
+                {"dimension": self.dimension, "generation": generation,
+                 "ids": self._ids, "payloads": self._payloads},
+                f,
+                ensure_ascii=False,
+            )
+        # The sidecar is replaced last, so a reader never sees it ahead of its arrays
+        os.replace(tmp_metadata, self.metadata_file)
+
+        self._generation = generation
+        self._map_vectors()
+        self._remove_old_generations()
+
+    # ------------------------------------------------------------------ #
+    # Search
+    # ------------------------------------------------------------------ #
+    def search(
+        self,
+        query_vector: Sequence[float],
+        limit: int = 5,
+        score_threshold: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """Return up to `limit` points as {"id", "score", "payload"}, best first"""
+        if not self._ids or limit <= 0:
+            return []
+
+        query = self._normalise(np.asarray(query_vector, dtype=np.float32).reshape(1, -1))[0]
+        if self.index_type == "exact" or len(self._ids) < self.ann_threshold:
+            rows, scores = self._exact_search(query, limit)
+        elif self.index_type == "hnsw" and self._hnsw_index() is not None:
+            rows, scores = self._hnsw_search(query, limit)
+        else:
+            rows, scores = self._ivf_search(query, limit)
+
+        results = []
+        for row, score in zip(rows, scores):
+            if score_threshold is not None and score < score_threshold:
+                break
+            results.append({"id": self._ids[row], "score": float(score), "payload": self._payloads[row]})
+        return results
+
+    def _exact_search(self, query: np.ndarray, limit: int, candidates: Optional[np.ndarray] = None):
+        if self.quantization != "none":
+            return self._rescored_search(query, limit, candidates)
+        matrix = self._vectors if candidates is None else self._vectors[candidates]
+        scores = matrix @ query
+        k = min(limit, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        rows = top if candidates is None else candidates[top]
+        return rows, scores[top]
+
+    def _rescored_search(self, query: np.ndarray, limit: int, candidates: Optional[np.ndarray] = None):
+        """Rank on the quantized vectors, then rescore the best candidates at full precision"""
+        codes, scales = self._quantized()
+        scaled_query = query if scales is None else (query * scales).astype(np.float32)
+        count = len(codes) if candidates is None else len(candidates)
+        approx = np.empty(count, dtype=np.float32)
+        for start in range(0, count, _SCAN_BLOCK):
+            stop = min(start + _SCAN_BLOCK, count)
+            block = codes[start:stop] if candidates is None else codes[candidates[start:stop]]
+            approx[start:stop] = block.astype(np.float32) @ scaled_query
+
+        k = min(limit * self.rescore_factor, count)
+        top = np.argpartition(-approx, k - 1)[:k]
+        # Sorted rows keep the reads from the memory-mapped matrix sequential
+        rows = np.sort(top if candidates is None else candidates[top])
+        scores = np.asarray(self._vectors[rows]) @ query
+        order = np.argsort(-scores)[:limit]
+        return rows[order], scores[order]
+
+    def _quantized(self):
+        """float16 copy, or int8 codes with per-dimension scales (rebuilt after writes)"""
+        if self._codes is None:
+            if self.quantization == "float16":
+                codes = np.empty(self._vectors.shape, dtype=np.float16)
+                scales = None
+            else:
+                scales = np.ones(self.dimension, dtype=np.float32)
+                if len(self._ids):
+                    scales = (np.abs(self._vectors).max(axis=0) / 127).astype(np.float32)
+                    scales[scales == 0] = 1.0
+                codes = np.empty(self._vectors.shape, dtype=np.int8)
+            for start in range(0, len(codes), _SCAN_BLOCK):
+                block = np.asarray(self._vectors[start:start + _SCAN_BLOCK], dtype=np.float32)
+                if scales is None:
+                    codes[start:start + _SCAN_BLOCK] = block
+                else:
+                    codes[start:start + _SCAN_BLOCK] = np.clip(np.rint(block / scales), -127, 127)
+            self._codes, self._scales = codes, scales
+        return self._codes, self._scales
+
+    def _ivf_search(self, query: np.ndarray, limit: int):
+        centroids, lists = self._ivf_index()
+        probes = np.argsort(-(centroids @ query))[: self.nprobe]
+        candidates = np.concatenate([lists[probe] for probe in probes])
+        if len(candidates) < limit:
+            return self._exact_search(query, limit)
+        return self._exact_search(query, limit, candidates)
+
+    def _ivf_index(self):
+        """Spherical k-means over the stored vectors (rebuilt after writes)"""
+        if self._ann is None or self._ann[0] != "ivf":
+            vectors = np.asarray(self._vectors)
+            nlist = max(1, int(np.sqrt(len(vectors))))
+            rng = np.random.default_rng(0)
+            centroids = vectors[rng.choice(len(vectors), nlist, replace=False)].copy()
+            for _ in range(10):
+                assignment = np.argmax(vectors @ centroids.T, axis=1)
+                for cluster in range(nlist):
+                    members = vectors[assignment == cluster]
+                    if len(members):
+                        centroids[cluster] = members.sum(axis=0)
+                centroids = self._normalise(centroids)
+            assignment = np.argmax(vectors @ centroids.T, axis=1)
+            lists = [np.flatnonzero(assignment == cluster) for cluster in range(nlist)]
+            self._ann = ("ivf", (centroids, lists))
+            logger.info(f"Built IVF index with {nlist} lists over {len(vectors)} vectors")
+        return self._ann[1]
+
+    def _hnsw_index(self):
+        if self._ann is None or self._ann[0] != "hnsw":
+            try:
+                import faiss
+            except ImportError:
+                logger.warning("faiss-cpu is not installed, falling back to the IVF index")
+                self.index_type = "ivf"
+                return None
+            index = faiss.IndexHNSWFlat(self.dimension, self.hnsw_m, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efSearch = self.hnsw_ef_search
+            index.add(np.ascontiguousarray(self._vectors, dtype=np.float32))
+            self._ann = ("hnsw", index)
+            logger.info(f"Built HNSW index over {len(self._ids)} vectors")
+        return self._ann[1]
+
+    def _hnsw_search(self, query: np.ndarray, limit: int):
+        scores, rows = self._hnsw_index().search(query.reshape(1, -1), limit)
+        found = rows[0] >= 0
+        return rows[0][found], scores[0][found]
+
+    # ------------------------------------------------------------------ #
+    # Helpers
+    # ------------------------------------------------------------------ #
+    def _load(self) -> None:
+        for attempt in range(3):
+            if not self.metadata_file.exists():
+                return
+            with open(self.metadata_file, encoding="utf-8") as f:
+                metadata = json.load(f)
+            if metadata["dimension"] != self.dimension:
+                raise ValueError(
+                    f"Local vector store at {self.path} has dimension {metadata['dimension']}, "
+                    f"expected {self.dimension}"
+                )
+            generation = metadata.get("generation")
+            try:
+                vectors = np.load(self._generation_file("embeddings", ".npy", generation), mmap_mode="r")
+                codes, scales = self._load_codes(generation, len(metadata["ids"]))
+            except FileNotFoundError:
+                # Concurrent saves retired this generation; read the new sidecar
+                if attempt == 2:
+                    raise
+                continue
+            break
+
+        self._generation = generation
+        self._ids = metadata["ids"]
+        self._payloads = metadata["payloads"]
+        self._row_of = {point_id: row for row, point_id in enumerate(self._ids)}
+        self._vectors = vectors
+        self._writable = False
+        self._codes, self._scales = codes, scales
+        logger.info(f"✅ Loaded local vector store ({len(self._ids)} vectors) from {self.path}")
+
+    def _load_codes(self, generation: Optional[str], count: int):
+        """Saved quantized codes of a generation, or (None, None) if absent or built differently"""
+        codes_file = self._generation_file("codes", ".npz", generation)
+        if self.quantization == "none" or not codes_file.exists():
+            return None, None
+        with np.load(codes_file) as data:
+            if str(data["quantization"]) != self.quantization or len(data["codes"]) != count:
+                return None, None
+            return data["codes"], data["scales"] if self.quantization == "int8" else None
+
+    def _generation_file(self, name: str, suffix: str, generation: Optional[str]) -> Path:
+        # Sidecars written before generations existed name the bare files
+        return self.path / (f"{name}.{generation}{suffix}" if generation else f"{name}{suffix}")
+
+    def _remove_old_generations(self) -> None:
+        files = list(self.path.glob("embeddings*.npy")) + list(self.path.glob("codes*.npz"))
+        generations: Dict[str, float] = {}
+        for file in files:
+            parts = file.name.split(".")
+            generation = parts[1] if len(parts) == 3 else ""
+            try:
+                generations[generation] = max(generations.get(generation, 0.0), file.stat().st_mtime)
+            except FileNotFoundError:
+                continue
+        newest = sorted(generations, key=generations.get, reverse=True)[:_KEEP_GENERATIONS]
+        for file in files:
+            parts = file.name.split(".")
+            generation = parts[1] if len(parts) == 3 else ""
+            if generation != self._generation and generation not in newest:
+                file.unlink(missing_ok=True)
+
+    def _map_vectors(self) -> None:
+        self._vectors = np.load(self.vectors_file, mmap_mode="r")
+        self._writable = False
+
+    def _ensure_writable(self) -> None:
+        if not self._writable:
+            self._vectors = np.array(self._vectors, dtype=np.float32)
+            self._writable = True
+
+    @staticmethod
+    def _normalise(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (matrix / norms).astype(np.float32)
+
+
+_local_store: Optional[LocalVectorStore] = None
+
+
+def get_local_vector_store() -> LocalVectorStore:
+    """Process-wide local store for settings.qdrant_collection_name"""
+    global _local_store
+    if _local_store is None:
+        _local_store = LocalVectorStore(settings.local_vector_path / settings.qdrant_collection_name)
+    return _local_store
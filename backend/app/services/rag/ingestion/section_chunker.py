@@ -0,0 +1,200 @@
+"""
+Section-aware chunking of knowledge-base entries.
+
+Entries are split at their own section headings instead of every
+`chunk_size` characters: upper-case headings on a line of their own
+("SYMPTOMS:", "WHEN TO SEE A DOCTOR:") and the MedlinePlus question headings
+that the collector glues to the previous sentence ("...too high.What causes
+diabetes?The ..."). Short neighbouring sections share a chunk, a section
+longer than a chunk is cut at line, then sentence boundaries, and no chunk
+spans two entries. Every chunk starts with the condition name and carries
+it, plus its section titles, in the payload metadata.
+
+iter_section_chunks() is a generator and shards large corpora across worker
+processes. SectionChunker can also be passed as `chunk_text` to
+IncrementalIngestor (settings.chunking_strategy = "section").
+"""
+
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.config import settings
+from app.services.rag.ingestion.incremental_ingestion import chunk_point_id, entry_id
+
+# "SYMPTOMS:" / "WHEN TO SEE A DOCTOR:" on a line of their own
+_CAPS_HEADING = re.compile(r"^[ \t]*([A-Z][A-Z0-9 ,/&()'-]{2,80}):[ \t]*$", re.M)
+# "What causes diabetes?" at the start or glued to the end of the previous sentence
+_QUESTION_HEADING = re.compile(
+    r"(?:\A|(?<=[.!?:)]))((?:What|How|Who|Why|When|Where|Which|Can|Is|Are|Do|Does|Should)\b[^.?!\n]{0,150}\?)"
+)
+# Places a long section may be cut, best first: line breaks, sentence ends,
+# and glued list items ("obesityBeing age 45 or older")
+_BREAKS = (
+    re.compile(r"\n+"),
+    re.compile(r"(?<=[.!?;:])\s+"),
+    re.compile(r"(?<=[a-z0-9)])(?=[A-Z][a-z])|\s+"),
+)
+
+
+def split_sections(content: str) -> List[Tuple[str, str]]:
+    """(title, body) pairs in order; text before the first heading has an empty title"""
+    headings = [(m.start(), m.end(), m.group(1).strip()) for m in _CAPS_HEADING.finditer(content)]
+    headings += [(m.start(), m.end(), m.group(1).strip()) for m in _QUESTION_HEADING.finditer(content)]
+    headings.sort()
+
+    sections = []
+    position, title = 0, ""
+    for start, end, heading in headings:
+        if start < position:
+            continue
+        body = content[position:start].strip()
+        if body or title:
+            sections.append((title, body))
+        position, title = end, heading
+    body = content[position:].strip()
+    if body or title:
+        sections.append((title, body))
+    return sections
+
+
+def _render(title: str, body: str) -> str:
+    if not title:
+        return body
+    if title.endswith("?"):
+        return f"{title}\n{body}"
+    return f"{title}:\n{body}"
+
+
+def _cut(text: str, budget: int) -> List[str]:
+    """Cut text into pieces of at most `budget` characters at the best available breaks"""
+    pieces = []
+    while len(text) > budget:
+        cut = None
+        for pattern in _BREAKS:
+            # Furthest break of this kind that still fills three quarters of the chunk
+            ends = [m.start() for m in pattern.finditer(text, budget * 3 // 4, budget + 1) if m.start() <= budget]
+            if ends:
+                cut = ends[-1]
+                break
+        if not cut:
+            cut = budget
+        pieces.append(text[:cut].strip())
+        text = text[cut:].strip()
+    if text:
+        pieces.append(text)
+    return pieces
+
+
+class SectionChunker:
+    def __init__(self, chunk_size: int = settings.chunk_size, min_body_size: int = 100):
+        self.chunk_size = chunk_size
+        self.min_body_size = min_body_size
+
+    @property
+    def config(self) -> Dict[str, Any]:
+        return {"strategy": "section", "chunk_size": self.chunk_size, "min_body_size": self.min_body_size}
+
+    def __call__(self, text: str) -> List[str]:
+        """Plain-text interface of the LangChain splitters: chunk text without entry metadata"""
+        return [chunk for chunk, _ in self._chunk_sections("", text)]
+
+    def chunk_entry(self, entry: Dict[str, Any], key: Optional[str] = None) -> List[tuple]:
+        """(point_id, chunk, payload) triples, in the shape of incremental_ingestion.chunk_entry"""
+        key = key or entry_id(entry)
+        condition = entry.get("condition", "")
+        metadata = {
+            "entry_id": key,
+            "condition": condition,
+            "source": entry.get("source", ""),
+            "source_url": entry.get("source_url", ""),
+            "category": entry.get("category", "general"),
+        }
+        points = []
+        for i, (chunk, titles) in enumerate(self._chunk_sections(condition, entry.get("content", ""))):
+            payload = {"page_content": chunk, "metadata": {**metadata, "chunk_index": i, "sections": titles}}
+            points.append((chunk_point_id(key, i), chunk, payload))
+        return points
+
+    def _chunk_sections(self, condition: str, content: str) -> List[Tuple[str, List[str]]]:
+        prefix = f"MEDICAL CONDITION: {condition}\n\n" if condition else ""
+        budget = max(self.min_body_size, self.chunk_size - len(prefix))
+
+        chunks: List[Tuple[str, List[str]]] = []
+        pending: List[str] = []
+        pending_titles: List[str] = []
+        pending_size = 0
+
+        def flush():
+            nonlocal pending, pending_titles, pending_size
+            if pending:
+                chunks.append((prefix + "\n\n".join(pending), pending_titles))
+            pending, pending_titles, pending_size = [], [], 0
+
+        for title, body in split_sections(content):
+            text = _render(title, body)
+            if pending and pending_size + 2 + len(text) > budget:
+                flush()
+            if len(text) <= budget:
+                pending.append(text)
+                pending_titles.append(title)
+                pending_size += len(text) + (2 if pending_size else 0)
+                continue
+
+            # A section longer than a chunk. Its title is kept in the metadata of
+            # every piece; repeating it in the text made continuation pieces
+            # outrank the opening one for heading-like queries
+            for piece in _cut(text, budget):
+                chunks.append((prefix + piece, [title]))
+        flush()
+        return chunks
+
+
+def _chunk_shard(chunker: SectionChunker, shard: List[Tuple[str, Dict[str, Any]]]) -> List[tuple]:
+    return [point for key, entry in shard for point in chunker.chunk_entry(entry, key)]
+
+
+def iter_section_chunks(
+    entries: Iterable[Dict[str, Any]],
+    chunker: Optional[SectionChunker] = None,
+    workers: Optional[int] = None,
+    shard_size: int = 64,
+) -> Iterator[tuple]:
+    """Chunk every distinct entry (first occurrence wins), in input order.
+
+    With more than one worker, shards of `shard_size` entries are chunked in
+    a process pool; at most two shards per worker are in flight, so memory
+    stays bounded however long `entries` is.
+    """
+    chunker = chunker or SectionChunker()
+    workers = workers if workers is not None else (os.cpu_count() or 1)
+
+    def shards():
+        seen, shard = set(), []
+        for entry in entries:
+            key = entry_id(entry)
+            if key in seen:
+                continue
+            seen.add(key)
+            shard.append((key, entry))
+            if len(shard) >= shard_size:
+                yield shard
+                shard = []
+        if shard:
+            yield shard
+
+    if workers <= 1:
+        for shard in shards():
+            yield from _chunk_shard(chunker, shard)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight: deque = deque()
+        for shard in shards():
+            in_flight.append(pool.submit(_chunk_shard, chunker, shard))
+            if len(in_flight) >= 2 * workers:
+                yield from in_flight.popleft().result()
+        while in_flight:
+            yield from in_flight.popleft().result()
@@ -0,0 +1,148 @@
+"""
+Process-wide registry for the heavy models used by app.services.rag.
+
+Every service obtains the embedding model and the Groq client from here
+instead of constructing its own, so each is loaded exactly once per process
+(all-MiniLM-L6-v2 alone costs ~5 s and a few hundred MB per load). preload()
+loads models at import time: run gunicorn with --preload and settings.preload_models
+set, and workers inherit the loaded weights copy-on-write from the master.
+
+status() reports per-model load counts, load times and resident memory so
+repeated loads show up in /health.
+"""
+
+import gc
+import os
+import resource
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable
+
+from loguru import logger
+
+from app.config import settings
+
+
+def resident_memory_bytes() -> int:
+    """Current RSS of this process (peak RSS where /proc is unavailable)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS
+        return peak if os.uname().sysname == "Darwin" else peak * 1024
+
+
+class ModelRegistry:
+    def __init__(self):
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._models: Dict[str, Any] = {}
+        self._info: Dict[str, Dict[str, Any]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.preloaded = False
+
+    def register(self, name: str, loader: Callable[[], Any]) -> None:
+        with self._lock:
+            self._loaders[name] = loader
+            self._locks.setdefault(name, threading.Lock())
+            self._info.setdefault(name, {"loads": 0, "failures": 0, "load_seconds": None,
+                                         "rss_delta_bytes": None, "loaded_in_pid": None, "error": None})
+
+    def get(self, name: str) -> Any:
+        """The model for `name`, loading it on first use; raises if loading fails"""
+        model = self._models.get(name)
+        if model is not None:
+            return model
+        if name not in self._loaders:
+            raise KeyError(f"Unknown model '{name}'")
+
+        with self._locks[name]:
+            model = self._models.get(name)
+            if model is not None:
+                return model
+            info = self._info[name]
+            rss_before = resident_memory_bytes()
+            started = time.perf_counter()
+            try:
+                model = self._loaders[name]()
+            except Exception as e:
+                info["failures"] += 1
+                info["error"] = str(e)
+                logger.error("❌ Failed to load model '{}': {}", name, e)
+                raise
+            info.update({
+                "loads": info["loads"] + 1,
+                "load_seconds": round(time.perf_counter() - started, 3),
+                "rss_delta_bytes": resident_memory_bytes() - rss_before,
+                "loaded_in_pid": os.getpid(),
+                "error": None,
+            })
+            self._models[name] = model
+            logger.info("✅ Loaded model '{}' in {}s (load #{})", name, info["load_seconds"], info["loads"])
+            return model
+
+    def preload(self, names: Iterable[str], freeze: bool = True) -> None:
+        """Load models now, e.g. in the gunicorn master before workers fork.
+
+        gc.freeze() moves everything loaded so far out of the collector's
+        reach, so collections in the workers do not touch (and copy) the
+        shared pages.
+        """
+        names = list(names)
+        for name in names:
+            self.get(name)
+        if names and freeze:
+            gc.freeze()
+        self.preloaded = self.preloaded or bool(names)
+
+    def status(self) -> Dict[str, Any]:
+        pid = os.getpid()
+        models = {}
+        for name, info in self._info.items():
+            models[name] = {
+                **info,
+                "loaded": name in self._models,
+                # Loaded in a parent process and shared with this worker via fork
+                "inherited": info["loaded_in_pid"] not in (None, pid),
+            }
+        return {
+            "pid": pid,
+            "preloaded": self.preloaded,
+            "resident_memory_bytes": resident_memory_bytes(),
+            "models": models,
+        }
+
+
+def _load_embedding_model():
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(settings.embedding_model_name, cache_folder=str(settings.cache_path))
+
+
+def _load_groq_client():
+    from groq import Groq
+
+    return Groq(api_key=settings.groq_api_key)
+
+
+model_registry = ModelRegistry()
+model_registry.register("embedding_model", _load_embedding_model)
+model_registry.register("groq_client", _load_groq_client)
+
+_embeddings = None
+
+
+def get_embeddings():
+    """Shared LangChain-compatible embeddings: the registry's model behind the on-disk cache"""
+    global _embeddings
+    if _embeddings is None:
+        from app.services.rag.ingestion.embedding_cache import CachedEmbeddings
+
+        model = model_registry.get("embedding_model")
+        _embeddings = CachedEmbeddings(
+            lambda texts: model.encode(texts, batch_size=settings.embedding_batch_size, normalize_embeddings=True),
+            settings.embedding_model_name,
+        )
+    return _embeddings
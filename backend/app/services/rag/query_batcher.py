@@ -0,0 +1,144 @@
+"""
+Dynamic micro-batching of query embeddings.
+
+Concurrent requests each need one query vector. Instead of a forward pass
+per query, callers enqueue their text and a single worker thread gathers
+whatever arrives within `max_wait_ms` of the first pending query (or until
+`max_batch_size` are waiting), encodes them in one batch and fans the
+vectors back out. A lone query waits at most `max_wait_ms`; under load the
+model sees full batches.
+
+Sync callers (LangChain retrievers running in the threadpool) use
+embed_query(); async endpoints await aembed_query().
+"""
+
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from loguru import logger
+
+from app.config import settings
+
+
+class QueryBatcher:
+    def __init__(
+        self,
+        encode: Callable[[List[str]], Sequence[Sequence[float]]],
+        max_batch_size: int = settings.embedding_batch_size,
+        max_wait_ms: float = settings.query_batch_max_wait_ms,
+    ):
+        self.encode = encode
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._batches = 0
+        self._queries = 0
+        self._full_batches = 0
+        self._encode_seconds = 0.0
+
+    def submit(self, text: str) -> Future:
+        """Queue a query; the future resolves to its vector"""
+        future: Future = Future()
+        self._ensure_worker()
+        self._queue.put((text, future))
+        return future
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.submit(text).result()
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return await asyncio.wrap_future(self.submit(text))
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Documents already come in batches, so they go straight to the encoder"""
+        return [list(map(float, vector)) for vector in self.encode(list(texts))]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "batches": self._batches,
+                "queries": self._queries,
+                "mean_batch_size": round(self._queries / self._batches, 2) if self._batches else 0.0,
+                "full_batches": self._full_batches,
+                "encode_seconds": round(self._encode_seconds, 3),
+                "pending": self._queue.qsize(),
+            }
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="query-batcher", daemon=True)
+                self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._encode_batch(batch)
+            except Exception as e:
+                # Keep the worker alive and never leave a caller waiting on its future
+                logger.exception("❌ Query batcher failed on a batch of {} queries", len(batch))
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _encode_batch(self, batch: List[tuple]) -> None:
+        # Callers that gave up (cancelled futures) are dropped before encoding
+        batch = [(text, future) for text, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        # Identical concurrent queries share one slot in the forward pass
+        slots: Dict[str, int] = {}
+        for text, _ in batch:
+            slots.setdefault(text, len(slots))
+
+        started = time.perf_counter()
+        try:
+            vectors = self.encode(list(slots))
+            elapsed = time.perf_counter() - started
+            if len(vectors) != len(slots):
+                raise ValueError(f"encoder returned {len(vectors)} vectors for {len(slots)} queries")
+            results = {text: list(map(float, vectors[slot])) for text, slot in slots.items()}
+        except Exception as e:
+            logger.error("❌ Batched query encoding failed for {} queries: {}", len(batch), e)
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        for text, future in batch:
+            future.set_result(results[text])
+
+        with self._lock:
+            self._batches += 1
+            self._queries += len(batch)
+            self._full_batches += len(batch) >= self.max_batch_size
+            self._encode_seconds += elapsed
+
+
+_query_batcher: Optional[QueryBatcher] = None
+
+
+def get_query_batcher() -> QueryBatcher:
+    """Process-wide batcher over the shared (cached) embedding model"""
+    global _query_batcher
+    if _query_batcher is None:
+        from app.services.rag.model_registry import get_embeddings
+
+        _query_batcher = QueryBatcher(get_embeddings().embed_documents)
+    return _query_batcher
@@ -0,0 +1,235 @@
+"""
+Semantic near-duplicate cache in front of the RAG query path.
+
+Each answered query is stored with its normalised embedding. A new query
+whose cosine similarity to a cached one reaches `threshold` is answered from
+the cache, skipping retrieval and generation ("high blood pressure symptoms"
+vs "what are signs of hypertension"). Entries are tagged with the collection
+version recorded in the ingestion manifest, so a re-ingestion that changes
+the collection empties the cache on the next lookup.
+
+A random sample of hits is kept for review (and checked by `verify`, when
+given) to estimate the false-hit rate of the chosen threshold.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from loguru import logger
+
+from app.config import settings
+
+
+class ManifestVersion:
+    """Reads collection_version from the ingestion manifest, re-parsing only when the file changes"""
+
+    def __init__(self, manifest_path: Path = settings.cache_path / "ingestion_manifest.json"):
+        self.manifest_path = Path(manifest_path)
+        self._stat: Optional[Tuple[int, int]] = None
+        self._version: Any = None
+
+    def __call__(self) -> Any:
+        try:
+            stat = os.stat(self.manifest_path)
+        except FileNotFoundError:
+            return None
+        if (stat.st_mtime_ns, stat.st_size) != self._stat:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                self._version = json.load(f).get("collection_version", 0)
+            self._stat = (stat.st_mtime_ns, stat.st_size)
+        return self._version
+
+
+class SemanticCache:
+    def __init__(
+        self,
+        embed_query: Callable[[str], Sequence[float]],
+        threshold: float = settings.semantic_cache_threshold,
+        max_entries: int = settings.semantic_cache_max_entries,
+        ttl_seconds: float = 3600,
+        collection_version: Optional[Callable[[], Any]] = None,
+        sample_rate: float = 0.05,
+        verify: Optional[Callable[[str, str], bool]] = None,
+        clock=time.monotonic,
+    ):
+        self.embed_query = embed_query
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.collection_version = collection_version or ManifestVersion()
+        self.sample_rate = sample_rate
+        self.verify = verify
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        # Row i of _vectors and _stored_at belongs to _entries[i]; rows are
+        # overwritten oldest-first when full
+        self._vectors: Optional[np.ndarray] = None
+        self._stored_at: Optional[np.ndarray] = None
+        self._entries: List[Dict[str, Any]] = []
+        self._next_row = 0
+        self._version = self.collection_version()
+
+        self._hits = 0
+        self._misses = 0
+        self._saved_seconds = 0.0
+        self._hit_similarity = 0.0
+        self._invalidations = 0
+        self._verified_hits = 0
+        self._false_hits = 0
+        self._samples: deque = deque(maxlen=100)
+
+    # ------------------------------------------------------------------ #
+    # Lookup and storage
+    # ------------------------------------------------------------------ #
+    def get_or_compute(
+        self,
+        query: str,
+        compute: Callable[[str], Any],
+        cacheable: Callable[[Any], bool] = bool,
+    ) -> Tuple[Any, bool]:
+        """Return (answer, cache_hit); on a miss run `compute` and cache its result"""
+        vector = self._normalise(self.embed_query(query))
+        cached = self.lookup(query, vector)
+        if cached is not None:
+            return cached, True
+
+        started = time.perf_counter()
+        answer = compute(query)
+        if cacheable(answer):
+            self.put(query, answer, time.perf_counter() - started, vector)
+        return answer, False
+
+    def lookup(self, query: str, vector: Optional[np.ndarray] = None) -> Optional[Any]:
+        """Answer of the most similar cached query at or above the threshold, else None"""
+        if vector is None:
+            vector = self._normalise(self.embed_query(query))
+        with self._lock:
+            self._check_version()
+            if not self._entries:
+                self._misses += 1
+                return None
+
+            similarities = self._vectors[: len(self._entries)] @ vector
+            # Expired entries must not shadow fresher near-duplicates
+            similarities[self._clock() - self._stored_at[: len(self._entries)] > self.ttl_seconds] = -np.inf
+            row = int(np.argmax(similarities))
+            similarity = float(similarities[row])
+            entry = self._entries[row]
+            if similarity < self.threshold:
+                self._misses += 1
+                return None
+
+            self._hits += 1
+            self._saved_seconds += entry["compute_seconds"]
+            self._hit_similarity += similarity
+            sampled = random.random() < self.sample_rate
+            if sampled:
+                self._samples.append({
+                    "query": query,
+                    "cached_query": entry["query"],
+                    "similarity": round(similarity, 4),
+                })
+            answer = entry["answer"]
+
+        if sampled and self.verify is not None:
+            self._record_verdict(self.verify(query, entry["query"]))
+        return answer
+
+    def put(self, query: str, answer: Any, compute_seconds: float = 0.0,
+            vector: Optional[np.ndarray] = None) -> None:
+        if self.max_entries <= 0:
+            return
+        if vector is None:
+            vector = self._normalise(self.embed_query(query))
+        with self._lock:
+            self._check_version()
+            if self._vectors is None:
+                self._vectors = np.zeros((self.max_entries, len(vector)), dtype=np.float32)
+                self._stored_at = np.zeros(self.max_entries, dtype=np.float64)
+            entry = {"query": query, "answer": answer, "compute_seconds": compute_seconds,
+                     "stored_at": self._clock()}
+            similarities = self._vectors[: len(self._entries)] @ vector
+            if len(similarities) and similarities.max() >= self.threshold:
+                # Replace the (expired) near-duplicate instead of adding another copy
+                row = int(np.argmax(similarities))
+                self._entries[row] = entry
+            elif len(self._entries) < self.max_entries:
+                row = len(self._entries)
+                self._entries.append(entry)
+            else:
+                row = self._next_row
+                self._entries[row] = entry
+                self._next_row = (row + 1) % self.max_entries
+            self._vectors[row] = vector
+            self._stored_at[row] = entry["stored_at"]
+
+    def invalidate(self) -> int:
+        """Drop every entry; returns how many were removed"""
+        with self._lock:
+            return self._clear()
+
+    # ------------------------------------------------------------------ #
+    # Metrics
+    # ------------------------------------------------------------------ #
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "collection_version": self._version,
+                "threshold": self.threshold,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "saved_seconds": round(self._saved_seconds, 3),
+                "mean_hit_similarity": round(self._hit_similarity / self._hits, 4) if self._hits else None,
+                "invalidations": self._invalidations,
+                "sampled_hits": len(self._samples),
+                "verified_hits": self._verified_hits,
+                "false_hits": self._false_hits,
+                "false_hit_rate": (
+                    round(self._false_hits / self._verified_hits, 4) if self._verified_hits else None
+                ),
+            }
+
+    def samples(self) -> List[Dict[str, Any]]:
+        """Recently sampled hits (query, cached query, similarity) for manual review"""
+        with self._lock:
+            return list(self._samples)
+
+    def _record_verdict(self, correct: bool) -> None:
+        with self._lock:
+            self._verified_hits += 1
+            if not correct:
+                self._false_hits += 1
+
+    # ------------------------------------------------------------------ #
+    # Helpers
+    # ------------------------------------------------------------------ #
+    def _check_version(self) -> None:
+        version = self.collection_version()
+        if version != self._version:
+            removed = self._clear()
+            logger.info(f"🔄 Collection version {self._version} -> {version}, dropped {removed} cached answers")
+            self._version = version
+
+    def _clear(self) -> int:
+        removed = len(self._entries)
+        self._entries = []
+        self._next_row = 0
+        self._invalidations += 1
+        return removed
+
+    @staticmethod
+    def _normalise(vector: Sequence[float]) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
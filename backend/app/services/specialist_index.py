@@ -0,0 +1,153 @@
+"""
+Precomputed disease -> specialist -> description lookup index.
+
+Doctor_Versus_Disease.csv (no header) and Disease_Description.csv are joined
+once at load time into a single table keyed by canonical disease name plus
+aliases, so a lookup is one dict access instead of a CSV scan per request.
+recommend() chains straight from the disease predictor: symptoms -> ranked
+diseases -> specialists and descriptions in one call.
+"""
+
+import csv
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from loguru import logger
+
+from app.config import settings
+from app.services.disease_predictor import DiseasePredictor, get_disease_predictor, normalize_disease
+
+_PARENTHESISED = re.compile(r"\(([^)]*)\)")
+
+# Spelling fixes and common names that the CSVs do not contain themselves
+DISEASE_ALIASES: Dict[str, List[str]] = {
+    "(vertigo) Paroymsal Positional Vertigo": [
+        "paroxysmal positional vertigo", "benign paroxysmal positional vertigo", "bppv",
+    ],
+    "Dimorphic hemmorhoids(piles)": ["dimorphic hemorrhoids(piles)", "hemorrhoids", "haemorrhoids"],
+    "Osteoarthristis": ["osteoarthritis"],
+    "Peptic ulcer diseae": ["peptic ulcer disease", "peptic ulcer"],
+    "GERD": ["gastroesophageal reflux disease", "acid reflux"],
+    "Heart attack": ["myocardial infarction"],
+    "Urinary tract infection": ["uti"],
+    "AIDS": ["hiv", "hiv/aids"],
+    "Diabetes": ["diabetes mellitus"],
+    "Hypertension": ["high blood pressure"],
+    "Hypoglycemia": ["low blood sugar"],
+}
+
+SPECIALIST_NAMES: Dict[str, str] = {
+    "internal medcine": "Internal Medicine",
+    "rheumatologists": "Rheumatologist",
+}
+
+
+def disease_key(name: str) -> str:
+    """Lookup key: case-folded with single spaces"""
+    return normalize_disease(name).casefold()
+
+
+def clean_specialist(name: str) -> str:
+    """Strip stray characters and fix known spelling variants"""
+    cleaned = " ".join(name.replace("�", " ").split())
+    return SPECIALIST_NAMES.get(cleaned.casefold(), cleaned[:1].upper() + cleaned[1:])
+
+
+def _derived_aliases(name: str) -> Iterable[str]:
+    """'Dimorphic hemmorhoids(piles)' -> 'piles', 'Dimorphic hemmorhoids'"""
+    for inner in _PARENTHESISED.findall(name):
+        yield inner
+    without = _PARENTHESISED.sub(" ", name)
+    if without.strip() and without != name:
+        yield without
+
+
+class SpecialistIndex:
+    def __init__(self, predictor: Optional[DiseasePredictor] = None):
+        self._predictor = predictor
+        self._entries: List[Dict[str, Any]] = []
+        self._keys: Dict[str, int] = {}
+
+    # ------------------------------------------------------------------ #
+    # Construction
+    # ------------------------------------------------------------------ #
+    @classmethod
+    def load(cls, doctor_path: Path = settings.doctor_disease_path,
+             description_path: Path = settings.disease_description_path,
+             predictor: Optional[DiseasePredictor] = None) -> "SpecialistIndex":
+        index = cls(predictor)
+        with open(doctor_path, newline="", encoding="utf-8", errors="replace") as f:
+            for row in csv.reader(f):
+                if len(row) >= 2 and row[0].strip():
+                    index._entry(row[0])["specialist"] = clean_specialist(row[1])
+
+        for canonical, aliases in DISEASE_ALIASES.items():
+            position = index._keys.get(disease_key(canonical))
+            if position is not None:
+                for alias in aliases:
+                    index._keys.setdefault(disease_key(alias), position)
+
+        with open(description_path, newline="", encoding="utf-8", errors="replace") as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            for row in reader:
+                if len(row) >= 2 and row[0].strip():
+                    index._entry(row[0])["description"] = " ".join(row[1].split())
+
+        logger.info(f"✅ Specialist index ready ({len(index._entries)} diseases, {len(index._keys)} keys)")
+        return index
+
+    def _entry(self, name: str) -> Dict[str, Any]:
+        """Entry for a disease name or alias, created on first sight"""
+        position = self._keys.get(disease_key(name))
+        if position is None:
+            position = len(self._entries)
+            self._entries.append({"disease": normalize_disease(name), "specialist": None, "description": None})
+            self._keys[disease_key(name)] = position
+            for alias in _derived_aliases(name):
+                self._keys.setdefault(disease_key(alias), position)
+        return self._entries[position]
+
+    # ------------------------------------------------------------------ #
+    # Lookup
+    # ------------------------------------------------------------------ #
+    def lookup(self, disease: str) -> Optional[Dict[str, Any]]:
+        """Specialist and description for a disease name or alias, in O(1)"""
+        position = self._keys.get(disease_key(disease))
+        return dict(self._entries[position]) if position is not None else None
+
+    def diseases(self) -> List[str]:
+        return [entry["disease"] for entry in self._entries]
+
+    def recommend(self, symptoms: Sequence[str], top_k: int = 3) -> Dict[str, Any]:
+        return self.recommend_batch([symptoms], top_k)[0]
+
+    def recommend_batch(self, symptom_lists: Sequence[Sequence[str]], top_k: int = 3) -> List[Dict[str, Any]]:
+        """Symptoms -> ranked diseases -> specialists, for every query in one pass"""
+        predictor = self._predictor or get_disease_predictor()
+        results = []
+        for prediction in predictor.predict_batch(symptom_lists, top_k):
+            ranked = []
+            for candidate in prediction["predictions"]:
+                entry = self.lookup(candidate["disease"]) or {"specialist": None, "description": None}
+                ranked.append({**candidate, "specialist": entry["specialist"], "description": entry["description"]})
+            results.append({
+                "predictions": ranked,
+                "specialists": list(dict.fromkeys(
+                    item["specialist"] for item in ranked if item["specialist"]
+                )),
+                "unknown_symptoms": prediction["unknown_symptoms"],
+            })
+        return results
+
+
+_index: Optional[SpecialistIndex] = None
+
+
+def get_specialist_index() -> SpecialistIndex:
+    """Process-wide index built from the CSVs on first use"""
+    global _index
+    if _index is None:
+        _index = SpecialistIndex.load()
+    return _index
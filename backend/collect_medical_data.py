@@ -5,9 +5,162 @@ from pathlib import Path
 import xml.etree.ElementTree as ET
 import time
 import re
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
 
-def collect_medlineplus_data():
-    """Collect real medical data from MedlinePlus XML API - Working version"""
+MEDLINEPLUS_API_URL = "https://wsearch.nlm.nih.gov/ws/query"
+
+# Medical topics to collect
+MEDICAL_TOPICS = [
+    "diabetes", "asthma", "hypertension", "heart disease", 
+    "depression", "anxiety", "pneumonia", "stroke",
+    "arthritis", "migraine", "allergies", "bronchitis"
+]
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` requests per second, bursts up to `capacity`"""
+    
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until a token is available"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+def create_http_session(pool_size):
+    """requests session whose connection pool is shared by all worker threads"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def fetch_topic_xml(session, topic, rate_limiter, base_url=MEDLINEPLUS_API_URL, max_retries=3, backoff_seconds=1.0):
+    """Open a streamed response for one topic, retrying transient failures with exponential backoff
+    
+    The body is not read yet, so retries only happen before its first byte;
+    iterate `response.iter_content()` and close the response when done.
+    """
+    
+    for attempt in range(max_retries + 1):
+        rate_limiter.acquire()
+        try:
+            response = session.get(base_url, params={"db": "healthTopics", "term": topic}, timeout=15, stream=True)
+            if response.status_code not in RETRYABLE_STATUS_CODES:
+                try:
+                    response.raise_for_status()
+                except requests.HTTPError:
+                    response.close()
+                    raise
+                return response
+            response.close()
+            retry_after = response.headers.get("Retry-After")
+            error = f"HTTP {response.status_code}"
+        except (requests.ConnectionError, requests.Timeout) as e:
+            retry_after = None
+            error = str(e)
+        
+        if attempt == max_retries:
+            raise RuntimeError(f"giving up after {max_retries + 1} attempts ({error})")
+        
+        delay = backoff_seconds * (2 ** attempt) + random.uniform(0, backoff_seconds)
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, int(retry_after))
+        print(f"🔁 Retrying {topic} in {delay:.1f}s ({error})")
+        time.sleep(delay)
+
+def iter_checkpoint(checkpoint_file):
+    """Yield (topic, entries) for topics collected by an interrupted run"""
+    
+    if not checkpoint_file.exists():
+        return
+    with open(checkpoint_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A crash can leave a truncated last line
+                continue
+            yield record["topic"], record["entries"]
+
+def load_checkpoint(checkpoint_file):
+    """Topics already collected by an interrupted run: {topic: entries}"""
+    return dict(iter_checkpoint(checkpoint_file))
+
+class StreamingCorpusWriter:
+    """Append entries to the JSONL and text corpora as soon as they are parsed
+    
+    Both files are written under a .tmp name and atomically renamed into
+    place by finalize(), so readers never see a half-written corpus.
+    """
+    
+    def __init__(self, data_dir):
+        self.jsonl_file = data_dir / "medlineplus_structured.jsonl"
+        self.text_file = data_dir / "medical_knowledge_comprehensive.txt"
+        self._jsonl_tmp = self.jsonl_file.with_name(self.jsonl_file.name + ".tmp")
+        self._text_tmp = self.text_file.with_name(self.text_file.name + ".tmp")
+        self._jsonl = open(self._jsonl_tmp, 'w', encoding='utf-8')
+        self._text = open(self._text_tmp, 'w', encoding='utf-8')
+        self.entry_count = 0
+    
+    def write_entries(self, entries):
+        for entry in entries:
+            self._jsonl.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            # Same layout as create_text_version: entries separated by a newline
+            if self.entry_count:
+                self._text.write("\n")
+            self._text.write(format_text_entry(entry))
+            self.entry_count += 1
+        self._jsonl.flush()
+        self._text.flush()
+    
+    def finalize(self):
+        """Sync both files to disk and rename them into place"""
+        for handle in (self._jsonl, self._text):
+            handle.flush()
+            os.fsync(handle.fileno())
+            handle.close()
+        os.replace(self._jsonl_tmp, self.jsonl_file)
+        os.replace(self._text_tmp, self.text_file)
+        print(f"📄 Created text version: {self.text_file}")
+        return self.jsonl_file
+    
+    def close(self):
+        """Close without publishing; the .tmp files are left for inspection"""
+        self._jsonl.close()
+        self._text.close()
+
+def collect_medlineplus_data(topics=None, concurrency=4, requests_per_second=2.0, max_retries=3,
+                             base_url=MEDLINEPLUS_API_URL, resume=True, streaming=False):
+    """Collect real medical data from MedlinePlus XML API - Working version
+    
+    Topics are fetched concurrently over a pooled session, throttled by a
+    token bucket, and every finished topic is appended to a checkpoint so an
+    interrupted run resumes where it stopped.
+    
+    With streaming=True entries are appended to medlineplus_structured.jsonl
+    and the text corpus as they arrive instead of being held in memory; they
+    are then written in completion order rather than topic order. Ingestion
+    (settings.medical_sources) reads whichever of the .jsonl and .json files
+    was written last.
+    """
     
     # Create directories
     data_dir = Path("app/data/medical_knowledge")
@@ -15,60 +168,106 @@ def collect_medlineplus_data():
     
     print("🏥 Collecting medical data from MedlinePlus XML API...")
     
-    # Medical topics to collect
-    medical_topics = [
-        "diabetes", "asthma", "hypertension", "heart disease", 
-        "depression", "anxiety", "pneumonia", "stroke",
-        "arthritis", "migraine", "allergies", "bronchitis"
-    ]
+    medical_topics = topics if topics is not None else MEDICAL_TOPICS
     
-    all_medical_data = []
-    successful_topics = 0
+    checkpoint_file = data_dir / "collection_checkpoint.jsonl"
+    writer = StreamingCorpusWriter(data_dir) if streaming else None
     
-    for topic in medical_topics:
-        try:
-            # Use the correct MedlinePlus XML API URL
-            url = f"https://wsearch.nlm.nih.gov/ws/query?db=healthTopics&term={topic}"
-            
-            print(f"📥 Fetching data for: {topic}")
-            
-            response = requests.get(url, timeout=15)
-            response.raise_for_status()
-            
-            # Parse XML response
-            medical_entries = parse_medlineplus_xml(response.text, topic)
-            
-            if medical_entries:
-                all_medical_data.extend(medical_entries)
-                successful_topics += 1
-                print(f"✅ Successfully collected {len(medical_entries)} entries for {topic}")
+    # topic -> entries (buffered mode) or number of entries (streaming mode)
+    completed = {}
+    if resume:
+        for topic, medical_entries in iter_checkpoint(checkpoint_file):
+            if writer is not None:
+                writer.write_entries(medical_entries)
+                completed[topic] = len(medical_entries)
             else:
-                print(f"⚠️ No data found for {topic}")
-            
-            # Be respectful to the API - small delay
-            time.sleep(1)
-            
-        except Exception as e:
-            print(f"⚠️ Failed to collect data for {topic}: {str(e)}")
-            continue
+                completed[topic] = medical_entries
+    if completed:
+        print(f"⏩ Resuming: {len(completed)} topics already collected")
+    
+    pending_topics = [topic for topic in medical_topics if topic not in completed]
+    rate_limiter = TokenBucket(requests_per_second, capacity=max(1, concurrency))
+    checkpoint_lock = threading.Lock()
+    
+    def collect_topic(session, topic):
+        print(f"📥 Fetching data for: {topic}")
+        with fetch_topic_xml(session, topic, rate_limiter, base_url, max_retries) as response:
+            # Raw byte chunks: the XML declaration carries the encoding
+            return parse_medlineplus_xml(response.iter_content(XML_FEED_SIZE), topic)
+    
+    try:
+        with create_http_session(concurrency) as session, \
+                open(checkpoint_file, 'a' if resume else 'w', encoding='utf-8') as checkpoint, \
+                ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = {executor.submit(collect_topic, session, topic): topic for topic in pending_topics}
+            for future in as_completed(futures):
+                topic = futures[future]
+                try:
+                    medical_entries = future.result()
+                except Exception as e:
+                    print(f"⚠️ Failed to collect data for {topic}: {str(e)}")
+                    continue
+                
+                with checkpoint_lock:
+                    checkpoint.write(json.dumps({"topic": topic, "entries": medical_entries}, ensure_ascii=False) + "\n")
+                    checkpoint.flush()
+                
+                if writer is not None:
+                    writer.write_entries(medical_entries)
+                    completed[topic] = len(medical_entries)
+                else:
+                    completed[topic] = medical_entries
+                
+                if medical_entries:
+                    print(f"✅ Successfully collected {len(medical_entries)} entries for {topic}")
+                else:
+                    print(f"⚠️ No data found for {topic}")
+    except BaseException:
+        if writer is not None:
+            writer.close()
+        raise
+    
+    successful_topics = sum(1 for topic in medical_topics if completed.get(topic))
     
     # Add comprehensive manual data as backup
     manual_data = get_comprehensive_medical_data()
-    all_medical_data.extend(manual_data)
     
-    print(f"📊 Total collected: {len(all_medical_data)} medical entries")
-    print(f"📡 API Success: {successful_topics}/{len(medical_topics)} topics")
+    if writer is not None:
+        writer.write_entries(manual_data)
+        total_entries = writer.entry_count
+        output_file = writer.finalize()
+    else:
+        # Keep the configured topic order regardless of completion order
+        all_medical_data = []
+        for topic in medical_topics:
+            all_medical_data.extend(completed.get(topic, []))
+        all_medical_data.extend(manual_data)
+        total_entries = len(all_medical_data)
+        
+        # Save structured data
+        output_file = data_dir / "medlineplus_structured.json"
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(all_medical_data, f, indent=2, ensure_ascii=False)
+        
+        # Create text version for RAG ingestion
+        create_text_version(all_medical_data, data_dir)
     
-    # Save structured data
-    output_file = data_dir / "medlineplus_structured.json"
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(all_medical_data, f, indent=2, ensure_ascii=False)
+    print(f"📊 Total collected: {total_entries} medical entries")
+    print(f"📡 API Success: {successful_topics}/{len(medical_topics)} topics")
     
-    # Create text version for RAG ingestion
-    create_text_version(all_medical_data, data_dir)
+    # Every topic was fetched, so the next run starts from scratch
+    if all(topic in completed for topic in medical_topics):
+        checkpoint_file.unlink(missing_ok=True)
     
     print(f"💾 Saved to: {output_file}")
-    return len(all_medical_data) > 0
+    return total_entries > 0
+
+# Precompiled patterns for clean_xml_text
+_TAG_PATTERN = re.compile(r'<[^>]+>')
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+
+# Bytes fed to the pull parser at a time
+XML_FEED_SIZE = 64 * 1024
 
 def parse_medlineplus_xml(xml_content, topic):
     """Parse MedlinePlus XML response and extract medical information"""
@@ -76,79 +275,89 @@ def parse_medlineplus_xml(xml_content, topic):
     medical_entries = []
     
     try:
-        root = ET.fromstring(xml_content)
-        
-        # Find all document elements
-        documents = root.findall('.//document')
-        
-        for doc in documents:
-            # Extract URL
-            url = doc.get('url', '')
-            
-            # Extract content fields
-            title = ""
-            full_summary = ""
-            alt_title = ""
-            
-            for content in doc.findall('content'):
-                name = content.get('name', '')
-                
-                if name == 'title':
-                    title = clean_xml_text(content)
-                elif name == 'FullSummary':
-                    full_summary = clean_xml_text(content)
-                elif name == 'altTitle':
-                    alt_title = clean_xml_text(content)
-            
-            # Create medical entry if we have substantial content
-            if full_summary and len(full_summary) > 100:
-                medical_entry = {
-                    "condition": title or topic.title(),
-                    "content": full_summary,
-                    "alternative_names": alt_title,
-                    "source": "MedlinePlus API",
-                    "source_url": url,
-                    "category": "health_topic",
-                    "search_term": topic
-                }
-                
-                medical_entries.append(medical_entry)
-    
+        medical_entries.extend(iter_medlineplus_entries(xml_content, topic))
     except ET.ParseError as e:
+        # Entries from documents before the malformed part are kept
         print(f"XML parsing error for {topic}: {e}")
+    except requests.RequestException:
+        # A connection dropped mid-body: fail the topic instead of checkpointing a partial page
+        raise
     except Exception as e:
         print(f"Error processing {topic}: {e}")
     
     return medical_entries
 
-def clean_xml_text(element):
-    """Clean XML text content, removing HTML tags and extra whitespace"""
+def iter_medlineplus_entries(xml_chunks, topic):
+    """Incrementally parse MedlinePlus XML, yielding one entry per <document>
     
-    # Get all text content from element and subelements
-    text_parts = []
+    `xml_chunks` is the whole response (bytes or str) or any iterable of
+    byte chunks, e.g. `response.iter_content()`. Each document element is
+    cleared once converted, so memory does not grow with the result page.
+    """
     
-    def extract_text(elem):
-        if elem.text:
-            text_parts.append(elem.text)
-        for child in elem:
-            extract_text(child)
-            if child.tail:
-                text_parts.append(child.tail)
+    if isinstance(xml_chunks, (bytes, str)):
+        # Feed in slices so finished documents are released between feeds
+        xml_content = xml_chunks
+        xml_chunks = (xml_content[i:i + XML_FEED_SIZE] for i in range(0, len(xml_content), XML_FEED_SIZE))
     
-    extract_text(element)
-    full_text = ''.join(text_parts)
+    parser = ET.XMLPullParser(events=('end',))
+    for chunk in xml_chunks:
+        parser.feed(chunk)
+        yield from _read_documents(parser, topic)
+    parser.close()
+    yield from _read_documents(parser, topic)
+
+def _read_documents(parser, topic):
+    for _, element in parser.read_events():
+        if element.tag != 'document':
+            continue
+        medical_entry = document_to_entry(element, topic)
+        element.clear()
+        if medical_entry:
+            yield medical_entry
+
+def document_to_entry(doc, topic):
+    """Build a medical entry from one <document> element (None if too thin)"""
+    
+    # Extract URL
+    url = doc.get('url', '')
     
-    # Remove HTML tags
-    clean_text = re.sub(r'<[^>]+>', '', full_text)
+    # Extract content fields
+    title = ""
+    full_summary = ""
+    alt_title = ""
     
-    # Remove span highlights
-    clean_text = re.sub(r'<span class="qt\d+">(.*?)</span>', r'\1', clean_text)
+    for content in doc.findall('content'):
+        name = content.get('name', '')
+        
+        if name == 'title':
+            title = clean_xml_text(content)
+        elif name == 'FullSummary':
+            full_summary = clean_xml_text(content)
+        elif name == 'altTitle':
+            alt_title = clean_xml_text(content)
     
-    # Clean up whitespace
-    clean_text = re.sub(r'\s+', ' ', clean_text)
-    clean_text = clean_text.strip()
+    # Create medical entry if we have substantial content
+    if full_summary and len(full_summary) > 100:
+        return {
+            "condition": title or topic.title(),
+            "content": full_summary,
+            "alternative_names": alt_title,
+            "source": "MedlinePlus API",
+            "source_url": url,
+            "category": "health_topic",
+            "search_term": topic
+        }
+    return None
+
+def clean_xml_text(element):
+    """Clean XML text content, removing HTML tags and extra whitespace"""
     
-    return clean_text
+    # One pass over the text of the element and its subelements; the
+    # highlight <span>s are plain tags, so tag removal covers them
+    full_text = ''.join(element.itertext())
+    clean_text = _TAG_PATTERN.sub('', full_text)
+    return _WHITESPACE_PATTERN.sub(' ', clean_text).strip()
 
 def get_comprehensive_medical_data():
     """Comprehensive manual medical data as reliable backup"""
@@ -302,14 +511,9 @@ WHEN TO SEEK EMERGENCY CARE:
         }
     ]
 
-def create_text_version(medical_data, data_dir):
-    """Create text version optimized for RAG ingestion"""
-    
-    text_content = []
-    
-    for entry in medical_data:
-        # Format each entry for better RAG chunking
-        text_entry = f"""
+def format_text_entry(entry):
+    """Format one entry for better RAG chunking"""
+    return f"""
 MEDICAL CONDITION: {entry['condition']}
 SOURCE: {entry['source']}
 CATEGORY: {entry.get('category', 'general')}
@@ -322,12 +526,17 @@ SEARCH TERMS: {entry.get('search_term', 'general')}
 
 ---
 """
-        text_content.append(text_entry)
+
+def create_text_version(medical_data, data_dir):
+    """Create text version optimized for RAG ingestion"""
     
-    # Save comprehensive text file
+    # Save comprehensive text file, writing entries one at a time
     text_file = data_dir / "medical_knowledge_comprehensive.txt"
     with open(text_file, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(text_content))
+        for index, entry in enumerate(medical_data):
+            if index:
+                f.write('\n')
+            f.write(format_text_entry(entry))
     
     print(f"📄 Created text version: {text_file}")
 
@@ -0,0 +1,256 @@
+"""
+Non-blocking structured logging shared by the Flask app and the FastAPI backend.
+
+The request path only enqueues the LogRecord (message arguments unformatted)
+on a bounded queue; when the queue is full the record is dropped and counted
+instead of blocking the request. A background listener drains the queue in
+batches, formats messages there, and writes JSON lines to a size-rotated file
+(plus a human-readable console stream), flushing once per batch. A forked
+child gets a fresh queue and listener of its own, so workers forked after
+setup (gunicorn --preload) keep logging to the same file.
+
+The backend logs through loguru; install_loguru() routes it into the same
+pipeline.
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import traceback
+import weakref
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Attributes every LogRecord has; anything else came in through `extra=`
+_RECORD_FIELDS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message, source and extra fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "module": record.module,
+            "function": record.funcName,
+            "line": record.lineno,
+            "thread": record.threadName,
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_FIELDS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_text or record.exc_info:
+            entry["exception"] = record.exc_text or self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _BatchedRotatingFileHandler(RotatingFileHandler):
+    """RotatingFileHandler whose per-record flush is deferred to the end of a batch"""
+
+    def flush(self) -> None:
+        pass
+
+    def flush_batch(self) -> None:
+        super().flush()
+
+
+class _BatchedStreamHandler(logging.StreamHandler):
+    def flush(self) -> None:
+        pass
+
+    def flush_batch(self) -> None:
+        super().flush()
+
+
+class DroppingQueueHandler(logging.Handler):
+    """Enqueues records without formatting them; counts records dropped on a full queue"""
+
+    def __init__(self, record_queue: "queue.Queue[logging.LogRecord]"):
+        super().__init__()
+        self.queue = record_queue
+        self.enqueued = 0
+        self.dropped = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if record.exc_info:
+            # Tracebacks are rendered here, while the frames are still meaningful
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        try:
+            self.queue.put_nowait(record)
+            self.enqueued += 1
+        except queue.Full:
+            self.dropped += 1
+
+
+class LogPipeline:
+    def __init__(
+        self,
+        log_dir: Path,
+        filename: str,
+        level: int = logging.INFO,
+        max_bytes: int = 50 * 1024 * 1024,
+        backup_count: int = 5,
+        queue_size: int = 10000,
+        batch_size: int = 256,
+        console: bool = True,
+    ):
+        Path(log_dir).mkdir(parents=True, exist_ok=True)
+        self.path = Path(log_dir) / filename
+        self.level = level
+        self.batch_size = batch_size
+        self.queue: "queue.Queue[Optional[logging.LogRecord]]" = queue.Queue(maxsize=queue_size)
+        self.handler = DroppingQueueHandler(self.queue)
+
+        file_handler = _BatchedRotatingFileHandler(
+            self.path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+        )
+        file_handler.setFormatter(JsonLinesFormatter())
+        self._outputs: List[logging.Handler] = [file_handler]
+        if console:
+            stream_handler = _BatchedStreamHandler(sys.stderr)
+            stream_handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+            self._outputs.append(stream_handler)
+
+        self.written = 0
+        self.batches = 0
+        # Held for each batch, so a fork never copies a half-written, unflushed batch
+        self._write_lock = threading.Lock()
+        self._stopped = False
+        self._start_listener()
+        _register_fork_hooks(self)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "enqueued": self.handler.enqueued,
+            "dropped": self.handler.dropped,
+            "written": self.written,
+            "batches": self.batches,
+            "queue_depth": self.queue.qsize(),
+        }
+
+    def stop(self) -> None:
+        """Write everything still queued, then stop the listener"""
+        self._stopped = True
+        if self._thread.is_alive():
+            self.queue.put(None)
+            self._thread.join(timeout=5)
+        for output in self._outputs:
+            output.flush_batch()
+            output.close()
+
+    def _start_listener(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def _before_fork(self) -> None:
+        self._write_lock.acquire()
+
+    def _after_fork_in_parent(self) -> None:
+        self._write_lock.release()
+
+    def _after_fork_in_child(self) -> None:
+        """Give a forked worker its own queue and listener; the parent's thread did not survive the fork"""
+        self._write_lock = threading.Lock()
+        self.queue = queue.Queue(maxsize=self.queue.maxsize)
+        self.handler.queue = self.queue
+        self.handler.enqueued = self.handler.dropped = 0
+        self.written = self.batches = 0
+        if not self._stopped:
+            self._start_listener()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stopping = None in batch
+            self._write([record for record in batch if record is not None])
+            if stopping:
+                return
+
+    def _write(self, records: List[logging.LogRecord]) -> None:
+        with self._write_lock:
+            for record in records:
+                for output in self._outputs:
+                    if record.levelno >= output.level:
+                        try:
+                            output.handle(record)
+                        except Exception:
+                            output.handleError(record)
+            for output in self._outputs:
+                output.flush_batch()
+            self.written += len(records)
+            self.batches += 1
+
+
+def _register_fork_hooks(pipeline: LogPipeline) -> None:
+    """Restart the listener in forked children (e.g. gunicorn --preload workers)"""
+    if not hasattr(os, "register_at_fork"):
+        return
+    ref = weakref.ref(pipeline)
+
+    def call(method: str):
+        def hook() -> None:
+            target = ref()
+            if target is not None:
+                getattr(target, method)()
+        return hook
+
+    os.register_at_fork(
+        before=call("_before_fork"),
+        after_in_parent=call("_after_fork_in_parent"),
+        after_in_child=call("_after_fork_in_child"),
+    )
+
+
+def setup_logging(log_dir: Path, filename: str, level: int = logging.INFO, **options) -> LogPipeline:
+    """Route the root logger through a LogPipeline, replacing its handlers"""
+    pipeline = LogPipeline(log_dir, filename, level, **options)
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(pipeline.handler)
+    root.setLevel(level)
+    atexit.register(pipeline.stop)
+    return pipeline
+
+
+def install_loguru(pipeline: LogPipeline, level: str = "INFO") -> None:
+    """Send loguru records (the backend's logger) into the pipeline instead of stderr"""
+    from loguru import logger
+
+    def sink(message) -> None:
+        record = message.record
+        log_record = logging.LogRecord(
+            name=record["name"] or "loguru",
+            level=record["level"].no,
+            pathname=record["file"].path,
+            lineno=record["line"],
+            msg=record["message"],
+            args=None,
+            exc_info=None,
+            func=record["function"],
+        )
+        log_record.levelname = record["level"].name
+        log_record.created = record["time"].timestamp()
+        log_record.threadName = record["thread"].name
+        if record["exception"] is not None:
+            log_record.exc_text = "".join(traceback.format_exception(*record["exception"]))
+        log_record.__dict__.update(record["extra"])
+        pipeline.handler.handle(log_record)
+
+    logger.remove()
+    logger.add(sink, level=level, format="{message}", catch=False)
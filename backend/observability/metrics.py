@@ -0,0 +1,243 @@
+"""
+In-process latency histograms and counters with Prometheus text exposition.
+
+Shared by the Flask app (app.py at the repository root) and the FastAPI
+backend, so it depends on nothing but the standard library. Histograms use
+fixed, log-spaced buckets: observe() is a bisect plus a few additions under a
+lock, cheap enough to leave on in production. p50/p95/p99 are estimated from
+the buckets by linear interpolation.
+
+Each process keeps its own registry; with several workers, let Prometheus
+scrape and aggregate them.
+"""
+
+import bisect
+import threading
+import time
+from contextlib import ContextDecorator
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# 10 us .. ~60 s in steps of sqrt(2), i.e. quantile estimates within ~20%
+DEFAULT_BUCKETS: Tuple[float, ...] = tuple(float(f"{0.00001 * 2 ** (i / 2):.4g}") for i in range(46))
+QUANTILES = (0.5, 0.95, 0.99)
+_INF_LABEL = 'le="+Inf"'
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _HistogramChild:
+    __slots__ = ("_lock", "buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self._lock = threading.Lock()
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float) -> None:
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += seconds
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate the q-quantile from the bucket counts"""
+        with self._lock:
+            counts, total = list(self.counts), self.count
+        if not total:
+            return None
+        rank = q * total
+        seen = 0
+        for index, bucket_count in enumerate(counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.buckets[-1]
+
+
+class Histogram:
+    """Labelled latency histogram (seconds)"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._children: Dict[Tuple[str, ...], _HistogramChild] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str) -> _HistogramChild:
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, _HistogramChild(self.buckets))
+        return child
+
+    def observe(self, seconds: float, *values: str) -> None:
+        self.labels(*values).observe(seconds)
+
+    def time(self, *values: str) -> "Timer":
+        return Timer(self, values)
+
+    def snapshot(self) -> Dict[str, Dict[str, Optional[float]]]:
+        """{label values joined by '/': count, sum, p50, p95, p99} for JSON stats endpoints"""
+        summary = {}
+        for values, child in list(self._children.items()):
+            entry: Dict[str, Optional[float]] = {"count": child.count, "sum_seconds": round(child.sum, 6)}
+            for q in QUANTILES:
+                value = child.quantile(q)
+                entry[f"p{int(q * 100)}_seconds"] = round(value, 6) if value is not None else None
+            summary["/".join(values) or self.name] = entry
+        return summary
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        quantile_lines = []
+        for values, child in sorted(self._children.items()):
+            with child._lock:
+                counts, count, total = list(child.counts), child.count, child.sum
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, values, le)} {cumulative}")
+            lines.append(f'{self.name}_bucket{_format_labels(self.labelnames, values, _INF_LABEL)} {count}')
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, values)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, values)} {count}")
+            for q in QUANTILES:
+                value = child.quantile(q)
+                if value is not None:
+                    label = f'quantile="{q}"'
+                    quantile_lines.append(
+                        f"{self.name}_quantile{_format_labels(self.labelnames, values, label)} {value}"
+                    )
+        if quantile_lines:
+            lines += [
+                f"# HELP {self.name}_quantile Bucket-interpolated quantiles of {self.name}",
+                f"# TYPE {self.name}_quantile gauge",
+            ] + quantile_lines
+        return lines
+
+
+class Counter:
+    """Labelled monotonically increasing counter"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *values: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[values] = self._values.get(values, 0.0) + amount
+
+    def value(self, *values: str) -> float:
+        return self._values.get(values, 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for values, value in sorted(list(self._values.items())):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(value)}")
+        return lines
+
+
+class Timer(ContextDecorator):
+    """Records elapsed time into a histogram; usable as `with` block or decorator.
+
+    When `errors` is given, exceptions leaving the block also increment it
+    with the same label values.
+    """
+
+    def __init__(self, histogram: Histogram, values: Tuple[str, ...], errors: Optional[Counter] = None):
+        self._child = histogram.labels(*values)
+        self._values = values
+        self._errors = errors
+        self._started = 0.0
+
+    def _recreate_cm(self) -> "Timer":
+        # Decorated functions get a fresh timer per call, so concurrent calls don't share state
+        timer = Timer.__new__(Timer)
+        timer._child, timer._values, timer._errors, timer._started = self._child, self._values, self._errors, 0.0
+        return timer
+
+    def __enter__(self) -> "Timer":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self._child.observe(time.perf_counter() - self._started)
+        if exc_type is not None and self._errors is not None:
+            self._errors.inc(*self._values)
+        return False
+
+
+class MetricsRegistry:
+    def __init__(self, prefix: str = ""):
+        self.prefix = prefix
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(name, lambda full: Histogram(full, documentation, tuple(labelnames), buckets))
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(name, lambda full: Counter(full, documentation, tuple(labelnames)))
+
+    def render(self) -> str:
+        """Every metric in the Prometheus text exposition format (version 0.0.4)"""
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def _register(self, name, factory):
+        full_name = f"{self.prefix}{name}"
+        with self._lock:
+            if full_name not in self._metrics:
+                self._metrics[full_name] = factory(full_name)
+            return self._metrics[full_name]
+
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+REGISTRY = MetricsRegistry(prefix="healthchat_")
+STAGE_LATENCY = REGISTRY.histogram(
+    "stage_duration_seconds", "Time spent in each stage of query handling", ["stage"]
+)
+STAGE_ERRORS = REGISTRY.counter("stage_errors_total", "Exceptions raised inside an instrumented stage", ["stage"])
+REQUEST_LATENCY = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ["method", "route", "status"]
+)
+REQUESTS = REGISTRY.counter("http_requests_total", "HTTP requests by route and status", ["method", "route", "status"])
+
+
+def stage_timer(stage: str) -> Timer:
+    """`with stage_timer("validation"): ...` or `@stage_timer("retrieval")`"""
+    return Timer(STAGE_LATENCY, (stage,), STAGE_ERRORS)
+
+
+def record_request(method: str, route: str, status: int, seconds: float) -> None:
+    status_label = str(status)
+    REQUEST_LATENCY.observe(seconds, method, route, status_label)
+    REQUESTS.inc(method, route, status_label)
@@ -0,0 +1,214 @@
+"""
+Opt-in, per-request profiling with flamegraph-ready output.
+
+A request is profiled when it carries the privileged X-Profile-Token header
+or falls into the sampled fraction of requests. While it runs, a background
+thread samples the stacks of the request's own thread and of the threads
+running work it submitted through RequestProfiler.bind(), skipping stacks
+with no project code. On an event loop, the request thread is sampled only
+while the request's task is the one running; tasks it spawns and work it
+offloads without bind() are not captured. When it finishes, two files are
+written:
+
+    <stamp>_<method>_<route>.collapsed   "thread;frame;frame count" lines for
+                                         flamegraph.pl / speedscope / inferno
+    <stamp>_<method>_<route>.txt         top-N functions by self and total samples
+
+Standard library only, shared by the Flask app and the FastAPI backend. When
+neither a token nor a sample rate is configured, the integrations do not
+install their hooks at all, so disabled profiling costs nothing.
+"""
+
+import asyncio
+import functools
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+PROFILE_HEADER = "X-Profile-Token"
+_UNSAFE_FILENAME = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+class StackSampler:
+    """Samples the stacks of one request's threads every `interval` seconds until stopped.
+
+    The thread that creates the sampler is the request thread; when `task` is
+    given it is only sampled while that asyncio task is running. Other threads
+    are sampled while inside track().
+    """
+
+    def __init__(self, include_paths: Iterable[str], interval: float = 0.001,
+                 task: Optional["asyncio.Task"] = None):
+        self.include_paths = tuple(os.path.abspath(path) for path in include_paths)
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.thread_ident = threading.get_ident()
+        self._task = task
+        self._loop = task.get_loop() if task is not None else None
+        self._threads = {self.thread_ident}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        # code object -> (frame label, belongs to the project)
+        self._labels: dict = {}
+
+    def start(self) -> "StackSampler":
+        self._thread.start()
+        return self
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+    @contextmanager
+    def track(self):
+        """Sample the calling thread too while the block runs"""
+        ident = threading.get_ident()
+        self._threads = self._threads | {ident}
+        try:
+            yield
+        finally:
+            self._threads = self._threads - {ident}
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            self.samples += 1
+            frames = sys._current_frames()
+            for ident in self._threads:
+                frame = frames.get(ident)
+                if frame is None:
+                    continue
+                if ident == self.thread_ident and self._task is not None \
+                        and asyncio.current_task(self._loop) is not self._task:
+                    # The event loop is running another request's task (or idling)
+                    continue
+                stack = self._collapse(frame)
+                if stack is not None:
+                    self.stacks[f"{names.get(ident, ident)};{stack}"] += 1
+
+    def _collapse(self, frame) -> Optional[str]:
+        """Root-first frame labels, or None when no frame belongs to the project"""
+        labels: List[str] = []
+        in_project = False
+        while frame is not None:
+            code = frame.f_code
+            cached = self._labels.get(code)
+            if cached is None:
+                filename = os.path.abspath(code.co_filename)
+                # Project files relative to their root, others as package/module.py
+                root = next((path for path in self.include_paths if filename.startswith(path)), None)
+                short = os.path.relpath(filename, root) if root else os.path.join(
+                    os.path.basename(os.path.dirname(filename)), os.path.basename(filename))
+                label = f"{code.co_name} ({short}:{code.co_firstlineno})".replace(";", ",")
+                cached = self._labels[code] = (label, root is not None)
+            labels.append(cached[0])
+            in_project = in_project or cached[1]
+            frame = frame.f_back
+        if not in_project:
+            return None
+        return ";".join(reversed(labels))
+
+
+class RequestProfiler:
+    def __init__(
+        self,
+        output_dir: Path,
+        include_paths: Iterable[str],
+        token: Optional[str] = None,
+        sample_rate: float = 0.0,
+        interval: float = 0.001,
+        top_n: int = 25,
+    ):
+        self.output_dir = Path(output_dir)
+        self.include_paths = [os.path.abspath(path) for path in include_paths]
+        self.token = token or None
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.top_n = top_n
+        # One profile at a time, so bind() knows which request to attribute work to
+        self._busy = threading.Lock()
+        self._active: Optional[StackSampler] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.token is not None or self.sample_rate > 0
+
+    def should_profile(self, header_value: Optional[str]) -> bool:
+        if self.token is not None and header_value == self.token:
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def start(self, task: Optional["asyncio.Task"] = None) -> Optional[Tuple[StackSampler, float]]:
+        """Begin sampling the calling thread (and `task`, on an event loop), or None if busy"""
+        if not self._busy.acquire(blocking=False):
+            return None
+        self._active = StackSampler(self.include_paths, self.interval, task).start()
+        return self._active, time.perf_counter()
+
+    def bind(self, fn: Callable[..., Any]) -> Callable[..., Any]:
+        """`fn`, sampled as part of the current request when run on another thread.
+
+        Returns `fn` unchanged unless the calling thread is being profiled, so
+        wrapping every executor submission costs one attribute check.
+        """
+        sampler = self._active
+        if sampler is None or sampler.thread_ident != threading.get_ident():
+            return fn
+
+        @functools.wraps(fn)
+        def tracked(*args, **kwargs):
+            with sampler.track():
+                return fn(*args, **kwargs)
+        return tracked
+
+    def finish(self, session: Tuple[StackSampler, float], method: str, route: str, status: int) -> Path:
+        """Stop sampling and write the collapsed stacks and summary; returns the .collapsed path"""
+        sampler, started = session
+        try:
+            stacks = sampler.stop()
+            elapsed = time.perf_counter() - started
+        finally:
+            self._active = None
+            self._busy.release()
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S") + f"-{int(time.time() * 1000) % 1000:03d}"
+        base = self.output_dir / _UNSAFE_FILENAME.sub("_", f"{stamp}_{method}_{route}").strip("_")
+        collapsed_path = base.with_suffix(".collapsed")
+        with open(collapsed_path, "w", encoding="utf-8") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        with open(base.with_suffix(".txt"), "w", encoding="utf-8") as f:
+            f.write(self.summarize(stacks, sampler.samples, elapsed, f"{method} {route} -> {status}"))
+        return collapsed_path
+
+    def summarize(self, stacks: Counter, samples: int, elapsed: float, title: str) -> str:
+        """Top-N frames by self samples (leaf) and total samples (anywhere on the stack)"""
+        own: Counter = Counter()
+        total: Counter = Counter()
+        for stack, count in stacks.items():
+            frames = stack.split(";")[1:]
+            own[frames[-1]] += count
+            for frame in set(frames):
+                total[frame] += count
+
+        lines = [
+            title,
+            f"wall time {elapsed * 1000:.1f} ms, {samples} sampling ticks every "
+            f"{self.interval * 1000:g} ms, {sum(stacks.values())} stack samples",
+            "",
+            f"top {self.top_n} by self samples:",
+        ]
+        lines += [f"{count:8d}  {frame}" for frame, count in own.most_common(self.top_n)]
+        lines += ["", f"top {self.top_n} by total samples:"]
+        lines += [f"{count:8d}  {frame}" for frame, count in total.most_common(self.top_n)]
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,121 @@
+"""
+Chunk statistics, retrieval quality and throughput of the section-aware chunker
+Chunks the MedlinePlus knowledge base with the current recursive character
+splitter (settings.chunk_size / chunk_overlap) and with SectionChunker, then
+reports chunk counts and sizes, and retrieval quality over BM25 and dense
+indexes of each:
+
+- condition hit@k: an entry's alternative name as the query, hit when a
+  chunk of that condition is returned
+- answer hit@k: a section heading ("What causes diabetes?", "SYMPTOMS") as
+  the query, hit when a returned chunk of that entry holds the start of the
+  section's answer
+
+Dense retrieval uses the hashing encoder when sentence-transformers is not
+installed. Chunking throughput is timed serially and across worker
+processes on a corpus replicated --scale times.
+
+Usage (from the repository root):
+    python benchmarks/bench_chunking.py [--k K] [--chunk-size N] [--scale N] [--workers N]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'backend'))
+
+from langchain_text_splitters import RecursiveCharacterTextSplitter  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.services.rag.ingestion.bm25_index import BM25Index  # noqa: E402
+from app.services.rag.ingestion.incremental_ingestion import entry_id, iter_chunks, load_entries  # noqa: E402
+from app.services.rag.ingestion.local_vectorstore import LocalVectorStore  # noqa: E402
+from app.services.rag.ingestion.section_chunker import SectionChunker, iter_section_chunks, split_sections  # noqa: E402
+from bench_retrieval import SOURCE, load_encoder  # noqa: E402
+
+
+def evaluation_queries(entries):
+    """(query, entry id, text that a hit must contain or None) triples"""
+    condition_queries, answer_queries = [], []
+    for entry in entries:
+        key = entry_id(entry)
+        if entry.get('alternative_names'):
+            condition_queries.append((entry['alternative_names'], key, None))
+        for title, body in split_sections(entry['content']):
+            if title and body:
+                answer_queries.append((title, key, body[:60]))
+    return condition_queries, answer_queries
+
+
+def hit_rate(search, queries, k):
+    hits = 0
+    for query, key, needle in queries:
+        for result in search(query, k):
+            metadata = result['payload']['metadata']
+            if metadata['entry_id'] == key and (needle is None or needle in result['payload']['page_content']):
+                hits += 1
+                break
+    return hits / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--chunk-size', type=int, default=settings.chunk_size)
+    parser.add_argument('--scale', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    entries = load_entries([SOURCE])
+    recursive = RecursiveCharacterTextSplitter(
+        chunk_size=args.chunk_size, chunk_overlap=settings.chunk_overlap
+    ).split_text
+    section = SectionChunker(args.chunk_size)
+    chunkers = {'recursive': recursive, 'section': section}
+    condition_queries, answer_queries = evaluation_queries(entries)
+    encode = load_encoder()
+
+    print(f"{len(entries)} entries, {len(condition_queries)} condition / {len(answer_queries)} answer queries, "
+          f"chunk_size {args.chunk_size}")
+    print(f"{'chunker':<11}{'chunks':>8}{'avg chars':>11}{'max':>6}"
+          f"{'cond bm25':>11}{'cond dense':>12}{'ans bm25':>10}{'ans dense':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, chunker in chunkers.items():
+            points = list(iter_chunks(entries, chunker))
+            sizes = [len(chunk) for _, chunk, _ in points]
+
+            lexical = BM25Index(os.path.join(tmp, f'{name}-bm25')).build(points)
+            store = LocalVectorStore(os.path.join(tmp, f'{name}-vectors'), index_type='exact', autosave=False)
+            ids, chunks, payloads = zip(*points)
+            store.upsert(list(ids), encode(list(chunks)), list(payloads))
+
+            def dense(query, k):
+                return store.search(encode([query])[0], k)
+
+            scores = [hit_rate(search, queries, args.k)
+                      for queries in (condition_queries, answer_queries) for search in (lexical.search, dense)]
+            print(f"{name:<11}{len(points):>8}{statistics.mean(sizes):>11.1f}{max(sizes):>6}"
+                  f"{scores[0]:>11.3f}{scores[1]:>12.3f}{scores[2]:>10.3f}{scores[3]:>11.3f}")
+
+    # Distinct conditions so replicated entries are not deduplicated
+    corpus = [{**entry, 'source_url': f"{entry.get('source_url', '')}#{copy}"}
+              for copy in range(args.scale) for entry in entries]
+    print(f"\nthroughput over {len(corpus)} entries")
+    for label, run in (
+        ('recursive', lambda: sum(1 for _ in iter_chunks(corpus, recursive))),
+        ('section, 1 process', lambda: sum(1 for _ in iter_section_chunks(corpus, section, workers=1))),
+        (f"section, {args.workers} processes", lambda: sum(1 for _ in iter_section_chunks(corpus, section, workers=args.workers))),
+    ):
+        started = time.perf_counter()
+        count = run()
+        elapsed = time.perf_counter() - started
+        print(f"{label:<24}{count:>8} chunks{len(corpus) / elapsed:>12.0f} entries/s")
+
+
+if __name__ == '__main__':
+    main()
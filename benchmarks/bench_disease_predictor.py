@@ -0,0 +1,96 @@
+"""
+Throughput benchmark for the sparse symptom-matrix disease predictor
+Compares a row-by-row scan of Original_Dataset.csv (the naive approach) with
+DiseasePredictor.predict and predict_batch, and reports CSV parse time
+against loading the .npz artifact.
+
+Usage (from the repository root):
+    python benchmarks/bench_disease_predictor.py [--queries N] [--batch-size N]
+"""
+
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'backend'))
+
+from app.config import settings  # noqa: E402
+from app.services.disease_predictor import DiseasePredictor, normalize_disease, normalize_symptom  # noqa: E402
+
+
+def load_rows(csv_path):
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        return [
+            (normalize_disease(row[0]), {normalize_symptom(cell) for cell in row[1:] if cell.strip()})
+            for row in reader if row
+        ]
+
+
+def naive_predict(rows, symptoms, top_k=5):
+    """Score every dataset row and keep the best overlap per disease"""
+    query = {normalize_symptom(symptom) for symptom in symptoms}
+    best = {}
+    for disease, row_symptoms in rows:
+        overlap = len(query & row_symptoms)
+        if overlap > best.get(disease, 0):
+            best[disease] = overlap
+    return sorted(best.items(), key=lambda item: -item[1])[:top_k]
+
+
+def make_queries(predictor, count, seed=7):
+    rng = random.Random(seed)
+    return [rng.sample(predictor.symptoms, rng.randint(2, 6)) for _ in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--batch-size', type=int, default=256)
+    args = parser.parse_args()
+
+    csv_path = settings.disease_dataset_path
+    with tempfile.TemporaryDirectory() as tmp:
+        artifact = os.path.join(tmp, 'symptom_matrix.npz')
+        started = time.perf_counter()
+        predictor = DiseasePredictor.load(csv_path, artifact)
+        build_seconds = time.perf_counter() - started
+        started = time.perf_counter()
+        DiseasePredictor.load(csv_path, artifact)
+        artifact_seconds = time.perf_counter() - started
+
+    rows = load_rows(csv_path)
+    queries = make_queries(predictor, args.queries)
+
+    started = time.perf_counter()
+    for query in queries:
+        naive_predict(rows, query)
+    naive = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for query in queries:
+        predictor.predict(query)
+    single = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for offset in range(0, len(queries), args.batch_size):
+        predictor.predict_batch(queries[offset:offset + args.batch_size])
+    batched = time.perf_counter() - started
+
+    print(f"matrix: {len(predictor.diseases)} diseases x {len(predictor.symptoms)} symptoms, "
+          f"{predictor.matrix.nnz} non-zeros")
+    print(f"load: csv+build {build_seconds * 1000:.1f} ms, artifact {artifact_seconds * 1000:.1f} ms")
+    print(f"{'method':<22}{'predictions/s':>16}")
+    print(f"{'naive row scan':<22}{len(queries) / naive:>16,.0f}")
+    print(f"{'predict':<22}{len(queries) / single:>16,.0f}")
+    print(f"{'predict_batch':<22}{len(queries) / batched:>16,.0f}")
+
+
+if __name__ == '__main__':
+    main()
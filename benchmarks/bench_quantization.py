@@ -0,0 +1,98 @@
+"""
+Recall@k, memory and latency of quantized local vector storage
+Embeds the MedlinePlus chunks the way bench_retrieval does, stores them in a
+float32 LocalVectorStore and in float16 / int8 stores, and compares their
+exact-search results against float32 for every condition name and sample
+query. A result counts as recalled when its float32 score reaches the k-th
+float32 score, so ties (common with the hashing encoder) are not misses.
+"no rescore" ranks on the quantized vectors alone (rescore factor 1).
+--scale N adds N-1 perturbed copies of every chunk to stand in for a larger
+corpus.
+
+Usage (from the repository root):
+    python benchmarks/bench_quantization.py [--k K] [--scale N] [--rescore-factor F]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'backend'))
+
+from app.config import settings  # noqa: E402
+from app.services.rag.ingestion.incremental_ingestion import default_chunker, iter_chunks, iter_entries  # noqa: E402
+from app.services.rag.ingestion.local_vectorstore import LocalVectorStore  # noqa: E402
+from bench_retrieval import QUERIES, SOURCE, load_encoder  # noqa: E402
+
+
+def scaled_corpus(vectors, scale, seed=0):
+    """The original vectors plus scale-1 noisy copies of each"""
+    rng = np.random.default_rng(seed)
+    vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    copies = [vectors]
+    for _ in range(scale - 1):
+        copies.append(vectors + rng.normal(0, 0.05, vectors.shape).astype(np.float32))
+    return np.vstack(copies).astype(np.float32)
+
+
+def evaluate(store, vectors, query_vectors, k):
+    recalls, latencies = [], []
+    for query in query_vectors:
+        query = query / max(np.linalg.norm(query), 1e-12)
+        exact = vectors @ query
+        kth = np.partition(-exact, k - 1)[k - 1] * -1
+        started = time.perf_counter()
+        found = [result['id'] for result in store.search(query, k)]
+        latencies.append((time.perf_counter() - started) * 1000)
+        recalls.append(np.count_nonzero(exact[found] >= kth - 1e-6) / k)
+    return float(np.mean(recalls)), float(np.median(latencies))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--scale', type=int, default=1)
+    parser.add_argument('--rescore-factor', type=int, default=settings.quantization_rescore_factor)
+    args = parser.parse_args()
+
+    points = list(iter_chunks(iter_entries([SOURCE]), default_chunker()))
+    encode = load_encoder()
+    _, chunks, _ = zip(*points)
+    vectors = scaled_corpus(np.asarray(encode(list(chunks)), dtype=np.float32), args.scale)
+    vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    ids = list(range(len(vectors)))
+
+    conditions = sorted({payload['metadata']['condition'] for _, _, payload in points})
+    query_vectors = np.asarray(encode(conditions + QUERIES), dtype=np.float32)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        def build(name, quantization, rescore_factor=args.rescore_factor):
+            store = LocalVectorStore(os.path.join(tmp, name), index_type='exact', autosave=False,
+                                     quantization=quantization, rescore_factor=rescore_factor)
+            store.upsert(ids, vectors)
+            store.save()
+            return store
+
+        configs = [('float32', build('float32', 'none'))]
+        for quantization in ('float16', 'int8'):
+            configs.append((quantization, build(quantization, quantization)))
+            configs.append((f"{quantization} no rescore", build(f"{quantization}-raw", quantization, 1)))
+
+        print(f"{len(vectors)} vectors x {settings.embedding_dimension}d, {len(query_vectors)} queries, "
+              f"rescore factor {args.rescore_factor}")
+        print(f"{'storage':<20}{'scan MB':>10}{'vs f32':>8}{f'recall@{args.k}':>12}{'p50 ms':>10}")
+        for name, store in configs:
+            footprint = store.memory_footprint()
+            scanned = footprint['codes_bytes'] or footprint['vectors_bytes']
+            recall, p50 = evaluate(store, vectors, query_vectors, args.k)
+            print(f"{name:<20}{scanned / 2 ** 20:>10.2f}{scanned / footprint['vectors_bytes']:>8.2f}"
+                  f"{recall:>12.4f}{p50:>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
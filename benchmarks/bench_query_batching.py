@@ -0,0 +1,112 @@
+"""
+Throughput vs latency of per-request and micro-batched query encoding
+Runs closed-loop clients at several concurrency levels, each encoding one
+query at a time, either straight through the model (one forward pass per
+query, serialised on the model like a CPU-bound torch module) or through
+QueryBatcher. With sentence-transformers installed the real
+settings.embedding_model_name is used; otherwise a cost model stands in
+(fixed per-pass overhead plus per-query cost, defaults roughly matching
+all-MiniLM-L6-v2 on CPU).
+
+Usage (from the repository root):
+    python benchmarks/bench_query_batching.py [--concurrency 1 4 16 64] [--queries N]
+        [--max-wait-ms MS] [--overhead-ms MS] [--per-query-ms MS]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'backend'))
+
+from app.config import settings  # noqa: E402
+from app.services.rag.query_batcher import QueryBatcher  # noqa: E402
+
+QUERIES = [
+    'what are the warning signs of a stroke',
+    'how can I lower my blood pressure naturally',
+    'my child keeps wheezing at night',
+    'is it safe to exercise with arthritis',
+    'side effects of metformin',
+    'when should I see a doctor for a fever',
+    'early symptoms of type 2 diabetes',
+    'how is asthma treated',
+]
+
+
+def load_encoder(overhead_ms, per_query_ms):
+    model_lock = threading.Lock()
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError:
+        print(f'sentence-transformers not installed: simulating {overhead_ms} ms + {per_query_ms} ms/query per pass')
+
+        def encode(texts):
+            with model_lock:
+                time.sleep((overhead_ms + per_query_ms * len(texts)) / 1000)
+            return np.zeros((len(texts), settings.embedding_dimension), dtype=np.float32)
+        return encode
+
+    model = SentenceTransformer(settings.embedding_model_name)
+
+    def encode(texts):
+        with model_lock:
+            return model.encode(texts, batch_size=settings.embedding_batch_size)
+    return encode
+
+
+def run_clients(embed_query, concurrency, queries_per_client):
+    latencies = [[] for _ in range(concurrency)]
+
+    def client(index):
+        for i in range(queries_per_client):
+            text = f"{QUERIES[(index + i) % len(QUERIES)]} ({index}-{i})"
+            started = time.perf_counter()
+            embed_query(text)
+            latencies[index].append((time.perf_counter() - started) * 1000)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    samples = np.array([latency for per_client in latencies for latency in per_client])
+    return len(samples) / elapsed, np.percentile(samples, 50), np.percentile(samples, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16, 64])
+    parser.add_argument('--queries', type=int, default=200, help='total queries per run')
+    parser.add_argument('--max-wait-ms', type=float, default=settings.query_batch_max_wait_ms)
+    parser.add_argument('--overhead-ms', type=float, default=4.0)
+    parser.add_argument('--per-query-ms', type=float, default=0.3)
+    args = parser.parse_args()
+
+    encode = load_encoder(args.overhead_ms, args.per_query_ms)
+    encode(QUERIES)  # warm-up
+
+    print(f"max batch {settings.embedding_batch_size}, max wait {args.max_wait_ms} ms")
+    print(f"{'clients':>8}{'mode':>10}{'queries/s':>12}{'p50 ms':>10}{'p99 ms':>10}{'mean batch':>12}")
+    for concurrency in args.concurrency:
+        per_client = max(1, args.queries // concurrency)
+
+        qps, p50, p99 = run_clients(lambda text: encode([text])[0], concurrency, per_client)
+        print(f"{concurrency:>8}{'direct':>10}{qps:>12.1f}{p50:>10.2f}{p99:>10.2f}{1:>12.2f}")
+
+        batcher = QueryBatcher(encode, settings.embedding_batch_size, args.max_wait_ms)
+        qps, p50, p99 = run_clients(batcher.embed_query, concurrency, per_client)
+        print(f"{concurrency:>8}{'batched':>10}{qps:>12.1f}{p50:>10.2f}{p99:>10.2f}"
+              f"{batcher.stats()['mean_batch_size']:>12.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""
+Latency benchmark for BM25, dense-only and hybrid retrieval
+Chunks the MedlinePlus knowledge base the way ingestion does, builds a BM25
+index and an exact LocalVectorStore, and times each retrieval mode over a set
+of exact-term and natural-language queries. Dense timings include encoding
+the query with settings.embedding_model_name; when sentence-transformers is
+not installed a hashing encoder stands in, which makes the dense numbers a
+lower bound.
+
+Usage (from the repository root):
+    python benchmarks/bench_retrieval.py [--repeat N] [--limit K]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import zlib
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'backend'))
+
+from app.config import settings  # noqa: E402
+from app.services.rag.ingestion.bm25_index import BM25Index, HybridRetriever, tokenize  # noqa: E402
+from app.services.rag.ingestion.incremental_ingestion import default_chunker, iter_chunks, iter_entries  # noqa: E402
+from app.services.rag.ingestion.local_vectorstore import LocalVectorStore  # noqa: E402
+
+SOURCE = os.path.join(ROOT, 'backend', 'app', 'data', 'medical_knowledge', 'medlineplus_structured.json')
+QUERIES = [
+    'Metformin',
+    'DASH diet',
+    'insulin resistance',
+    'inhaled corticosteroids',
+    'what are the warning signs of a stroke',
+    'how can I lower my blood pressure naturally',
+    'my child keeps wheezing at night',
+    'is it safe to exercise with arthritis',
+]
+
+
+def load_encoder():
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError:
+        print('sentence-transformers not installed: using a hashing encoder (dense timings are a lower bound)')
+
+        def encode(texts):
+            vectors = np.zeros((len(texts), settings.embedding_dimension), dtype=np.float32)
+            for row, text in enumerate(texts):
+                for token in tokenize(text):
+                    vectors[row, zlib.crc32(token.encode()) % settings.embedding_dimension] += 1.0
+            return vectors
+        return encode
+
+    model = SentenceTransformer(settings.embedding_model_name)
+    return lambda texts: model.encode(texts, batch_size=settings.embedding_batch_size)
+
+
+def time_mode(search, repeat):
+    samples = []
+    for _ in range(repeat):
+        for query in QUERIES:
+            started = time.perf_counter()
+            search(query)
+            samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return statistics.mean(samples), samples[len(samples) // 2], samples[int(len(samples) * 0.95)]
+
+
+def term_hits(search):
+    """Exact-term queries whose term appears in at least one returned chunk"""
+    hits = 0
+    for query in QUERIES[:4]:
+        results = search(query)
+        if any(query.lower() in result['payload']['page_content'].lower() for result in results):
+            hits += 1
+    return f"{hits}/4"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--limit', type=int, default=5)
+    args = parser.parse_args()
+
+    points = list(iter_chunks(iter_entries([SOURCE]), default_chunker()))
+    encode = load_encoder()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        lexical = BM25Index(os.path.join(tmp, 'bm25')).build(points)
+        lexical.save()
+        lexical = BM25Index.load(os.path.join(tmp, 'bm25'))
+
+        store = LocalVectorStore(os.path.join(tmp, 'vectors'), index_type='exact', autosave=False)
+        ids, chunks, payloads = zip(*points)
+        store.upsert(list(ids), encode(list(chunks)), list(payloads))
+
+        def dense_search(query, limit):
+            return store.search(encode([query])[0], limit)
+
+        retriever = HybridRetriever(lexical, dense_search)
+        modes = {
+            'bm25': lambda q: retriever.retrieve(q, args.limit, mode='lexical')['results'],
+            'dense': lambda q: retriever.retrieve(q, args.limit, mode='dense')['results'],
+            'hybrid': lambda q: retriever.retrieve(q, args.limit, mode='hybrid')['results'],
+        }
+
+        print(f"{len(points)} chunks, {len(lexical.terms)} terms, {len(QUERIES)} queries x {args.repeat}")
+        print(f"{'mode':<10}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'term hits':>12}")
+        for name, search in modes.items():
+            mean, p50, p95 = time_mode(search, args.repeat)
+            print(f"{name:<10}{mean:>10.3f}{p50:>10.3f}{p95:>10.3f}{term_hits(search):>12}")
+
+
+if __name__ == '__main__':
+    main()
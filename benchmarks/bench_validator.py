@@ -0,0 +1,151 @@
+"""
+Micro-benchmark for InputValidator.validate_input
+Compares the precompiled single-pass matcher against the original
+per-pattern / per-term implementation on a small realistic query corpus.
+
+Usage (from the repository root):
+    python benchmarks/bench_validator.py [--iterations N]
+"""
+
+import argparse
+import html
+import logging
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import InputValidator  # noqa: E402
+
+QUERIES = [
+    "I have a headache and fever",
+    "I have had a severe headache and fever for three days, and my throat is sore. What should I do?",
+    "What are the symptoms of diabetes?",
+    "My chest pain started suddenly after climbing stairs, is this an emergency?",
+    "Can you recommend a doctor for skin allergy?",
+    "How much water should I drink every day?",
+    "tell me a joke",
+    "Stomach ache and nausea after eating, feeling dizzy and tired",
+    "javascript:alert(1)",
+    "What is the best treatment for a persistent cough and cold?",
+    "Is it normal to feel weak after the flu? I have been tired for two weeks now.",
+    "ok",
+]
+
+
+class LegacyInputValidator(InputValidator):
+    """The original validate_input, kept here as the 'before' reference"""
+
+    def validate_input(self, user_input):
+        result = {
+            'is_valid': False,
+            'cleaned_input': '',
+            'error_message': '',
+            'warning_message': '',
+            'is_health_related': False,
+            'has_urgency': False,
+            'confidence_score': 0.0
+        }
+        if not user_input or not isinstance(user_input, str):
+            result['error_message'] = "Please provide a valid text input."
+            return result
+        cleaned_input = str(user_input).strip()
+        cleaned_input = html.escape(cleaned_input)
+        cleaned_input = re.sub(r'\s+', ' ', cleaned_input)
+        if not cleaned_input or cleaned_input.isspace():
+            result['error_message'] = "Input cannot be empty or contain only whitespace."
+            return result
+        char_count = len(cleaned_input)
+        if char_count < self.config['min_length']:
+            result['error_message'] = f"Input too short. Please provide at least {self.config['min_length']} characters."
+            return result
+        if char_count > self.config['max_length']:
+            result['error_message'] = f"Input too long. Please limit to {self.config['max_length']} characters."
+            return result
+        words = cleaned_input.split()
+        word_count = len(words)
+        if word_count < self.config['min_words']:
+            result['error_message'] = "Please provide a more detailed query."
+            return result
+        if word_count > self.config['max_words']:
+            result['error_message'] = "Query too long. Please be more concise."
+            return result
+        for pattern in self.malicious_patterns:
+            if re.search(pattern, cleaned_input, re.IGNORECASE):
+                result['error_message'] = "Input contains potentially harmful content. Please rephrase your query."
+                return result
+        if not self.allowed_pattern.match(cleaned_input):
+            result['error_message'] = "Input contains invalid characters. Please use only letters, numbers, and basic punctuation."
+            return result
+        special_chars = len(re.findall(r'[^a-zA-Z0-9\s.,!?;:()\-\'\""]', cleaned_input))
+        special_char_ratio = special_chars / len(cleaned_input) if cleaned_input else 0
+        if special_char_ratio > self.config['max_special_char_ratio']:
+            result['error_message'] = "Too many special characters. Please use standard text."
+            return result
+        text_lower = cleaned_input.lower()
+        is_health_related = any(term in text_lower for term in self.medical_terms)
+        has_urgency = any(keyword in text_lower for keyword in self.urgency_keywords)
+        confidence_score = 0.0
+        if len(words) >= 3:
+            confidence_score += 0.2
+        medical_term_count = sum(1 for term in self.medical_terms if term in text_lower)
+        confidence_score += min(medical_term_count * 0.15, 0.5)
+        if re.search(r'\?', cleaned_input):
+            confidence_score += 0.1
+        confidence_score = min(confidence_score, 1.0)
+        result.update({
+            'is_valid': True,
+            'cleaned_input': cleaned_input,
+            'is_health_related': is_health_related,
+            'has_urgency': has_urgency,
+            'confidence_score': confidence_score
+        })
+        warnings = []
+        if not is_health_related:
+            warnings.append("This doesn't appear to be health-related. I work best with medical questions.")
+        if has_urgency:
+            warnings.append("⚠️ For urgent medical concerns, please contact emergency services immediately!")
+        if confidence_score < 0.4:
+            warnings.append("Your query might be unclear. Consider adding more details.")
+        if warnings:
+            result['warning_message'] = " | ".join(warnings)
+        return result
+
+
+def time_per_query(validator, iterations):
+    """Average microseconds per validate_input call over the corpus"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for query in QUERIES:
+            validator.validate_input(query)
+    elapsed = time.perf_counter() - start
+    return elapsed / (iterations * len(QUERIES)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+
+    # Measure the matcher, not the log handlers
+    logging.disable(logging.CRITICAL)
+
+    before = LegacyInputValidator()
+    after = InputValidator()
+
+    for query in QUERIES:
+        assert before.validate_input(query) == after.validate_input(query), query
+
+    before_us = time_per_query(before, args.iterations)
+    after_us = time_per_query(after, args.iterations)
+
+    print(f"queries per pass : {len(QUERIES)}")
+    print(f"before (legacy)  : {before_us:8.2f} us/query")
+    print(f"after (compiled) : {after_us:8.2f} us/query")
+    print(f"speedup          : {before_us / after_us:8.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+Throughput benchmark for the MedlinePlus XML parser
+Compares the streaming pull parser (parse_medlineplus_xml) against the
+original ET.fromstring + recursive clean_xml_text implementation on the
+recorded fixtures in benchmarks/fixtures, replicated into a large result page.
+
+Usage (from the repository root):
+    python benchmarks/bench_xml_parser.py [--copies N] [--repeat N]
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(ROOT, 'benchmarks', 'fixtures')
+sys.path.insert(0, os.path.join(ROOT, 'backend'))
+
+from collect_medical_data import parse_medlineplus_xml  # noqa: E402
+
+
+def legacy_clean_xml_text(element):
+    """The original clean_xml_text, kept as the 'before' reference"""
+    text_parts = []
+
+    def extract_text(elem):
+        if elem.text:
+            text_parts.append(elem.text)
+        for child in elem:
+            extract_text(child)
+            if child.tail:
+                text_parts.append(child.tail)
+
+    extract_text(element)
+    clean_text = re.sub(r'<[^>]+>', '', ''.join(text_parts))
+    clean_text = re.sub(r'<span class="qt\d+">(.*?)</span>', r'\1', clean_text)
+    return re.sub(r'\s+', ' ', clean_text).strip()
+
+
+def legacy_parse_medlineplus_xml(xml_content, topic):
+    """The original tree-building parser, kept as the 'before' reference"""
+    medical_entries = []
+    root = ET.fromstring(xml_content)
+    for doc in root.findall('.//document'):
+        title = full_summary = alt_title = ""
+        for content in doc.findall('content'):
+            name = content.get('name', '')
+            if name == 'title':
+                title = legacy_clean_xml_text(content)
+            elif name == 'FullSummary':
+                full_summary = legacy_clean_xml_text(content)
+            elif name == 'altTitle':
+                alt_title = legacy_clean_xml_text(content)
+        if full_summary and len(full_summary) > 100:
+            medical_entries.append({
+                "condition": title or topic.title(),
+                "content": full_summary,
+                "alternative_names": alt_title,
+                "source": "MedlinePlus API",
+                "source_url": doc.get('url', ''),
+                "category": "health_topic",
+                "search_term": topic
+            })
+    return medical_entries
+
+
+def load_fixture_page(copies):
+    """Concatenate the documents of every fixture `copies` times into one page"""
+    documents = []
+    for name in sorted(os.listdir(FIXTURES)):
+        if name.endswith('.xml'):
+            with open(os.path.join(FIXTURES, name), 'rb') as f:
+                documents.extend(re.findall(rb'<document .*?</document>', f.read(), re.S))
+    body = b'\n'.join(documents * copies)
+    return (b'<?xml version="1.0" encoding="UTF-8"?>\n<nlmSearchResult><list>\n'
+            + body + b'\n</list></nlmSearchResult>\n')
+
+
+def measure(parse, page, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        entries = parse(page, 'benchmark')
+        best = min(best, time.perf_counter() - start)
+    return best, entries
+
+
+def peak_memory_mb(parse, page):
+    """Peak Python heap allocated while parsing, excluding the input page"""
+    tracemalloc.start()
+    parse(page, 'benchmark')
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--copies', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    page = load_fixture_page(args.copies)
+    megabytes = len(page) / 1e6
+
+    before_s, before_entries = measure(legacy_parse_medlineplus_xml, page, args.repeat)
+    after_s, after_entries = measure(parse_medlineplus_xml, page, args.repeat)
+    assert before_entries == after_entries
+
+    print(f"page size          : {megabytes:8.2f} MB, {len(after_entries)} entries")
+    print(f"before (fromstring): {megabytes / before_s:8.2f} MB/s  {len(before_entries) / before_s:10.0f} entries/s")
+    print(f"after (streaming)  : {megabytes / after_s:8.2f} MB/s  {len(after_entries) / after_s:10.0f} entries/s")
+    print(f"speedup            : {before_s / after_s:8.2f}x")
+    print(f"peak heap before   : {peak_memory_mb(legacy_parse_medlineplus_xml, page):8.2f} MB")
+    print(f"peak heap after    : {peak_memory_mb(parse_medlineplus_xml, page):8.2f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,283 @@
+"""
+Micro-benchmark suite for the Python hot paths, with recorded baselines
+Times input validation, the full /api/health/query handler (stubbed agent),
+MedlinePlus XML parsing and text cleaning, text corpus export and dataset CSV
+loading. Results are printed and optionally written as JSON; --save-baseline
+records them in benchmarks/baselines.json and --compare flags cases slower
+than the baseline by more than --threshold (exit status 1). Timings are
+machine-specific: re-record the baseline on the machine that runs --compare.
+
+Usage (from the repository root):
+    python benchmarks/run_benchmarks.py [--filter NAME] [--output results.json]
+    python benchmarks/run_benchmarks.py --save-baseline
+    python benchmarks/run_benchmarks.py --compare [--threshold 0.25]
+"""
+
+import argparse
+import atexit
+import contextlib
+import csv
+import importlib.util
+import io
+import json
+import logging
+import os
+import platform
+import re
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCHMARKS = os.path.join(ROOT, 'benchmarks')
+FIXTURES = os.path.join(BENCHMARKS, 'fixtures')
+BASELINE_PATH = os.path.join(BENCHMARKS, 'baselines.json')
+KNOWLEDGE_JSON = os.path.join(ROOT, 'backend', 'app', 'data', 'medical_knowledge', 'medlineplus_structured.json')
+DATASET_CSV = os.path.join(ROOT, 'backend', 'data', 'Original_Dataset.csv')
+
+# The backend's `app` package must be imported before the repository root is
+# on sys.path, otherwise the Flask app.py module would shadow it
+sys.path.insert(0, os.path.join(ROOT, 'backend'))
+
+from app.services.disease_predictor import DiseasePredictor  # noqa: E402
+from collect_medical_data import clean_xml_text, create_text_version, parse_medlineplus_xml  # noqa: E402
+
+QUERIES = [
+    "I have a headache and fever",
+    "I have had a severe headache and fever for three days, and my throat is sore. What should I do?",
+    "What are the symptoms of diabetes?",
+    "My chest pain started suddenly after climbing stairs, is this an emergency?",
+    "Can you recommend a doctor for skin allergy?",
+    "How much water should I drink every day?",
+    "tell me a joke",
+    "Stomach ache and nausea after eating, feeling dizzy and tired",
+    "javascript:alert(1)",
+    "What is the best treatment for a persistent cough and cold?",
+    "Is it normal to feel weak after the flu? I have been tired for two weeks now.",
+    "ok",
+    "What foods should I avoid with high blood pressure?",
+    "My child has a rash on her arms and a mild fever since yesterday",
+    "Which specialist treats joint pain and stiffness in the morning?",
+    "Can anxiety cause heart palpitations and shortness of breath?",
+    "how do I know if a cut is infected",
+    "Is metformin safe to take with ibuprofen?",
+    "<script>document.cookie</script> what is asthma",
+    "I keep waking up at night with leg cramps, what vitamins help?",
+]
+HEALTH_QUERIES = [
+    "What are the symptoms of diabetes?",
+    "I have had a severe headache and fever for three days, and my throat is sore. What should I do?",
+    "Stomach ache and nausea after eating, feeling dizzy and tired",
+    "What foods should I avoid with high blood pressure?",
+]
+
+
+_flask_app = None
+
+
+def load_flask_app():
+    """Import the root app.py as `health_chat_app` with stubbed heavy components"""
+    global _flask_app
+    if _flask_app is not None:
+        return _flask_app
+    sys.path.append(ROOT)
+    spec = importlib.util.spec_from_file_location('health_chat_app', os.path.join(ROOT, 'app.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    module.components.register('medical_agent', lambda: (lambda query: f"Stubbed answer for: {query}"))
+    module.components.register('specialist_recommender', lambda: (lambda query: []))
+    # Every request must take the full path, not the response cache
+    module.response_cache.max_entries = 0
+    _flask_app = module
+    return module
+
+
+def fixture_page(copies=10):
+    documents = []
+    for name in sorted(os.listdir(FIXTURES)):
+        if name.endswith('.xml'):
+            with open(os.path.join(FIXTURES, name), 'rb') as f:
+                documents.extend(re.findall(rb'<document .*?</document>', f.read(), re.S))
+    return (b'<?xml version="1.0" encoding="UTF-8"?>\n<nlmSearchResult><list>\n'
+            + b'\n'.join(documents * copies) + b'\n</list></nlmSearchResult>\n')
+
+
+# Each case builder returns (callable, units per call, unit name)
+def case_validator():
+    validator = load_flask_app().InputValidator()
+
+    def run():
+        for query in QUERIES:
+            validator.validate_input(query)
+    return run, len(QUERIES), 'query'
+
+
+def case_handle_health_query():
+    client = load_flask_app().app.test_client()
+    position = [0]
+
+    def run():
+        query = HEALTH_QUERIES[position[0] % len(HEALTH_QUERIES)]
+        position[0] += 1
+        response = client.post('/api/health/query', json={'query': query, 'session_id': 'bench'})
+        assert response.status_code == 200, response.get_json()
+    return run, 1, 'request'
+
+
+def case_parse_medlineplus_xml():
+    page = fixture_page()
+    return (lambda: parse_medlineplus_xml(page, 'benchmark')), len(page) / 1e6, 'MB'
+
+
+def case_clean_xml_text():
+    elements = ET.fromstring(fixture_page(copies=1)).findall('.//content')
+
+    def run():
+        for element in elements:
+            clean_xml_text(element)
+    return run, len(elements), 'element'
+
+
+def case_create_text_version():
+    with open(KNOWLEDGE_JSON, encoding='utf-8') as f:
+        entries = json.load(f)
+    directory = Path(tempfile.mkdtemp(prefix='bench-text-'))
+    atexit.register(shutil.rmtree, directory, True)
+
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            create_text_version(entries, directory)
+    return run, len(entries), 'entry'
+
+
+def case_read_dataset_csv():
+    def run():
+        with open(DATASET_CSV, newline='', encoding='utf-8') as f:
+            return list(csv.reader(f))
+    return run, 1, 'file'
+
+
+def case_build_symptom_matrix():
+    return (lambda: DiseasePredictor.from_csv(Path(DATASET_CSV))), 1, 'file'
+
+
+CASES = {
+    'validator.validate_input': case_validator,
+    'flask.handle_health_query': case_handle_health_query,
+    'xml.parse_medlineplus_xml': case_parse_medlineplus_xml,
+    'xml.clean_xml_text': case_clean_xml_text,
+    'export.create_text_version': case_create_text_version,
+    'csv.read_original_dataset': case_read_dataset_csv,
+    'csv.build_symptom_matrix': case_build_symptom_matrix,
+}
+
+
+def measure(run, rounds, min_time):
+    """Calibrate calls per round to last at least min_time, then time `rounds` rounds"""
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            run()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time:
+            break
+        number *= max(2, min(10, int(min_time / max(elapsed, 1e-9)) + 1))
+
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(number):
+            run()
+        samples.append((time.perf_counter() - started) / number)
+    return samples, number
+
+
+def run_suite(names, rounds, min_time):
+    results = {}
+    for name in names:
+        run, units, unit = CASES[name]()
+        samples, number = measure(run, rounds, min_time)
+        median = statistics.median(samples)
+        results[name] = {
+            'median_seconds': median,
+            'min_seconds': min(samples),
+            'stdev_seconds': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+            'rounds': rounds,
+            'calls_per_round': number,
+            'units_per_call': units,
+            'unit': unit,
+            'units_per_second': units / median,
+        }
+        print(f"{name:<30}{median * 1e6:>14.1f} us/call{units / median:>16,.1f} {unit}/s", flush=True)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Print the change against the baseline; returns the names that regressed.
+
+    Fastest rounds are compared, as they are the least affected by other load
+    on the machine.
+    """
+    regressions = []
+    print(f"\n{'case (fastest round)':<30}{'baseline us':>14}{'current us':>14}{'change':>10}")
+    for name, result in results.items():
+        reference = baseline.get('results', {}).get(name)
+        if reference is None:
+            print(f"{name:<30}{'-':>14}{result['min_seconds'] * 1e6:>14.1f}{'new':>10}")
+            continue
+        change = result['min_seconds'] / reference['min_seconds'] - 1
+        flag = ''
+        if change > threshold:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print(f"{name:<30}{reference['min_seconds'] * 1e6:>14.1f}"
+              f"{result['min_seconds'] * 1e6:>14.1f}{change:>+10.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--filter', default='', help='only run cases whose name contains this text')
+    parser.add_argument('--rounds', type=int, default=7)
+    parser.add_argument('--min-time', type=float, default=0.1, help='minimum seconds per round')
+    parser.add_argument('--output', help='write results as JSON to this path')
+    parser.add_argument('--save-baseline', action='store_true', help=f'write results to {BASELINE_PATH}')
+    parser.add_argument('--compare', action='store_true', help='compare against the baseline')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='relative slowdown of the fastest round reported as a regression')
+    args = parser.parse_args()
+
+    # Per-request INFO logging from app.py would dominate the output
+    logging.disable(logging.INFO)
+
+    names = [name for name in CASES if args.filter in name]
+    report = {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'results': run_suite(names, args.rounds, args.min_time),
+    }
+
+    for path in filter(None, [args.output, args.baseline if args.save_baseline else None]):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
+        print(f"wrote {path}")
+
+    if args.compare:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare(report['results'], json.load(f), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
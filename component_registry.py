@@ -0,0 +1,111 @@
+"""
+Lazy component registry for the Flask health chatbot backend
+Heavy modules (medical agent, specialist recommender) load on first use or
+through an explicit warm-up instead of at import time.
+"""
+
+import importlib.util
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LazyComponent:
+    """A component built by `loader` the first time it is requested"""
+
+    def __init__(self, name: str, loader: Callable[[], Any], module_name: Optional[str] = None):
+        self.name = name
+        self.module_name = module_name
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._value = None
+        self.state = 'unloaded'
+        self.load_seconds: Optional[float] = None
+        self.error: Optional[str] = None
+        # find_spec result, looked up once (it is on every health query's path)
+        self._module_present: Optional[bool] = None
+
+    def get(self) -> Optional[Any]:
+        """Load the component once; returns None if loading failed"""
+        if self.state in ('ready', 'failed'):
+            return self._value
+        with self._lock:
+            if self.state in ('ready', 'failed'):
+                return self._value
+            self.state = 'loading'
+            started = time.perf_counter()
+            try:
+                self._value = self._loader()
+                self.state = 'ready'
+                logger.info("Loaded component '%s'", self.name)
+            except Exception as e:
+                self.error = str(e)
+                self.state = 'failed'
+                logger.warning("Could not load component '%s': %s", self.name, e)
+            self.load_seconds = round(time.perf_counter() - started, 4)
+            return self._value
+
+    def available(self) -> bool:
+        """Whether the component is (or should be) usable, without loading it"""
+        if self.state == 'ready':
+            return True
+        if self.state == 'failed':
+            return False
+        if self.module_name is None:
+            return True
+        if self._module_present is None:
+            try:
+                self._module_present = importlib.util.find_spec(self.module_name) is not None
+            except (ImportError, ValueError):
+                self._module_present = False
+        return self._module_present
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            'state': self.state,
+            'load_seconds': self.load_seconds,
+            'error': self.error
+        }
+
+
+class ComponentRegistry:
+    """Named lazy components plus cold-start-to-ready tracking"""
+
+    def __init__(self, started_at: Optional[float] = None):
+        self._components: Dict[str, LazyComponent] = {}
+        self._started_at = started_at if started_at is not None else time.perf_counter()
+        self.cold_start_seconds: Optional[float] = None
+
+    def register(self, name: str, loader: Callable[[], Any], module_name: Optional[str] = None) -> None:
+        self._components[name] = LazyComponent(name, loader, module_name)
+
+    def get(self, name: str) -> Optional[Any]:
+        value = self._components[name].get()
+        self._check_ready()
+        return value
+
+    def available(self, name: str) -> bool:
+        return self._components[name].available()
+
+    def warmup(self, names: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """Load the given components (all by default) and return their status"""
+        for name in (names if names is not None else list(self._components)):
+            self.get(name)
+        return self.status()
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        return {name: component.status() for name, component in self._components.items()}
+
+    def _check_ready(self) -> None:
+        if self.cold_start_seconds is not None:
+            return
+        settled = (
+            component.state in ('ready', 'failed') or not component.available()
+            for component in self._components.values()
+        )
+        if all(settled):
+            self.cold_start_seconds = round(time.perf_counter() - self._started_at, 4)
+            logger.info("Cold start to ready: %ss", self.cold_start_seconds)
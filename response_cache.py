@@ -0,0 +1,85 @@
+"""
+Response cache for the Flask health chatbot backend
+LRU + TTL cache keyed on a normalized form of the validated query
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+_PUNCTUATION_PATTERN = re.compile(r'[^\w\s]')
+
+
+def normalize_query(text: str) -> str:
+    """Case-fold, strip punctuation and collapse whitespace"""
+    return ' '.join(_PUNCTUATION_PATTERN.sub('', text.casefold()).split())
+
+
+class ResponseCache:
+    """Thread-safe LRU cache with a size bound and per-entry TTL.
+
+    invalidate() drops every entry and should be called whenever the
+    knowledge base behind the medical agent is re-ingested.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: float = 3600, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        # normalized query -> (stored_at, value)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def get(self, query: str) -> Optional[Any]:
+        """Return the cached value for a query, or None on a miss"""
+        key = normalize_query(query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._clock() - entry[0] > self.ttl_seconds:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[1]
+
+    def put(self, query: str, value: Any) -> None:
+        """Store a value, evicting the least recently used entries over the bound"""
+        if self.max_entries <= 0:
+            return
+        key = normalize_query(query)
+        with self._lock:
+            self._entries[key] = (self._clock(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self) -> int:
+        """Drop every entry; returns how many were removed"""
+        with self._lock:
+            removed = len(self._entries)
+            self._entries.clear()
+            self._invalidations += 1
+            return removed
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'entries': len(self._entries),
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / lookups, 4) if lookups else 0.0,
+                'evictions': self._evictions,
+                'invalidations': self._invalidations
+            }
@@ -0,0 +1,315 @@
+"""
+Chat history storage for the Flask health chatbot backend
+Pluggable session stores: bounded in-memory (default) and shared SQLite (WAL)
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SessionStore(ABC):
+    """Interface every chat history backend implements"""
+
+    @abstractmethod
+    def append(self, session_id: str, entry: Dict[str, Any]) -> None:
+        """Record an interaction for a session"""
+
+    @abstractmethod
+    def get_history(self, session_id: str) -> List[Dict[str, Any]]:
+        """Return the retained interactions for a session (oldest first)"""
+
+    @abstractmethod
+    def stats(self) -> Dict[str, int]:
+        """Session and query counters"""
+
+    def close(self) -> None:
+        """Release resources; a no-op for stores that hold none"""
+
+
+class InMemorySessionStore(SessionStore):
+    """Bounded, thread-safe chat history store.
+
+    Sessions are kept in least-recently-used order, so both capacity and
+    idle-TTL eviction only ever look at the oldest end. Each session keeps a
+    fixed-size ring buffer of interactions, and running counters make
+    stats() constant time.
+    """
+
+    def __init__(self, capacity: int = 10000, ttl_seconds: float = 3600,
+                 history_size: int = 10, clock=time.monotonic):
+        self.capacity = capacity
+        self.ttl_seconds = ttl_seconds
+        self.history_size = history_size
+        self._clock = clock
+        self._lock = threading.Lock()
+        # session_id -> (last_access, ring buffer of interactions)
+        self._sessions: "OrderedDict[str, List[Any]]" = OrderedDict()
+        self._retained_entries = 0
+        self._total_appends = 0
+        self._evicted_sessions = 0
+
+    def append(self, session_id: str, entry: Dict[str, Any]) -> None:
+        """Record an interaction for a session, creating the session if needed"""
+        with self._lock:
+            now = self._clock()
+            self._evict_expired(now)
+
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = [now, deque(maxlen=self.history_size)]
+                self._sessions[session_id] = session
+            else:
+                session[0] = now
+                self._sessions.move_to_end(session_id)
+
+            buffer: Deque[Dict[str, Any]] = session[1]
+            if len(buffer) < self.history_size:
+                self._retained_entries += 1
+            buffer.append(entry)
+            self._total_appends += 1
+
+            while len(self._sessions) > self.capacity:
+                self._drop_oldest()
+
+    def get_history(self, session_id: str) -> List[Dict[str, Any]]:
+        """Return the retained interactions for a session (oldest first)"""
+        with self._lock:
+            now = self._clock()
+            self._evict_expired(now)
+
+            session = self._sessions.get(session_id)
+            if session is None:
+                return []
+            session[0] = now
+            self._sessions.move_to_end(session_id)
+            return list(session[1])
+
+    def stats(self) -> Dict[str, int]:
+        """Session and query counters, computed in O(1)"""
+        with self._lock:
+            self._evict_expired(self._clock())
+            return {
+                'total_sessions': len(self._sessions),
+                'total_queries': self._retained_entries,
+                'lifetime_queries': self._total_appends,
+                'evicted_sessions': self._evicted_sessions
+            }
+
+    def _evict_expired(self, now: float) -> None:
+        """Drop idle sessions from the least-recently-used end"""
+        while self._sessions:
+            last_access = next(iter(self._sessions.values()))[0]
+            if now - last_access <= self.ttl_seconds:
+                break
+            self._drop_oldest()
+
+    def _drop_oldest(self) -> None:
+        _, (_, buffer) = self._sessions.popitem(last=False)
+        self._retained_entries -= len(buffer)
+        self._evicted_sessions += 1
+
+
+class SQLiteSessionStore(SessionStore):
+    """Chat history shared by every worker process through a local SQLite file.
+
+    The database runs in WAL mode so readers never block the writer. append()
+    only enqueues the row; a background thread writes queued rows in batches
+    and periodically prunes expired sessions, sessions beyond capacity and
+    interactions beyond history_size. As in InMemorySessionStore, a session
+    expires as a whole ttl_seconds after its last interaction. get_history()
+    takes the write lock only while its own session has rows that are not yet
+    committed, and then writes just those. stats() serves a snapshot
+    refreshed by the background thread, so it stays O(1) on the request path.
+    """
+
+    def __init__(self, db_path: str, capacity: int = 10000, ttl_seconds: float = 3600,
+                 history_size: int = 10, flush_interval: float = 0.05,
+                 prune_interval: float = 60.0, stats_interval: float = 5.0):
+        self.db_path = db_path
+        self.capacity = capacity
+        self.ttl_seconds = ttl_seconds
+        self.history_size = history_size
+        self.flush_interval = flush_interval
+        self.prune_interval = prune_interval
+        self.stats_interval = stats_interval
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # session_id -> rows queued by append(); _unwritten also counts rows
+        # taken by a flush that has not committed yet
+        self._pending: Dict[str, List[tuple]] = {}
+        self._unwritten: Dict[str, int] = {}
+        self._pending_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._local = threading.local()
+        self._writer = self._connect()
+        self._create_schema()
+
+        self._total_appends = 0
+        self._stats_snapshot = {'total_sessions': 0, 'total_queries': 0, 'evicted_sessions': 0}
+        self._refresh_stats()
+
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='session-store-writer', daemon=True)
+        self._thread.start()
+
+    def append(self, session_id: str, entry: Dict[str, Any]) -> None:
+        """Queue an interaction; the background writer persists it"""
+        row = (session_id, time.time(), json.dumps(entry))
+        with self._pending_lock:
+            self._pending.setdefault(session_id, []).append(row)
+            self._unwritten[session_id] = self._unwritten.get(session_id, 0) + 1
+            self._total_appends += 1
+
+    def get_history(self, session_id: str) -> List[Dict[str, Any]]:
+        """Return the retained interactions for a session (oldest first)"""
+        # A client reads its own writes: persist this session's uncommitted rows first
+        if self._unwritten.get(session_id):
+            self.flush(session_id)
+        rows = self._reader().execute(
+            'SELECT entry FROM chat_history WHERE session_id = ? '
+            'AND (SELECT MAX(created_at) FROM chat_history WHERE session_id = ?) >= ? '
+            'ORDER BY created_at DESC, id DESC LIMIT ?',
+            (session_id, session_id, time.time() - self.ttl_seconds, self.history_size)
+        ).fetchall()
+        return [json.loads(row[0]) for row in reversed(rows)]
+
+    def stats(self) -> Dict[str, int]:
+        """Counters from the last background refresh plus this worker's appends"""
+        stats = dict(self._stats_snapshot)
+        stats['lifetime_queries'] = self._total_appends
+        return stats
+
+    def flush(self, session_id: Optional[str] = None) -> None:
+        """Write every queued row, or only those of `session_id`, in a single transaction"""
+        with self._write_lock:
+            with self._pending_lock:
+                if session_id is None:
+                    taken, self._pending = self._pending, {}
+                else:
+                    taken = {session_id: self._pending.pop(session_id, [])}
+            try:
+                rows = [row for session_rows in taken.values() for row in session_rows]
+                if rows:
+                    with self._writer:
+                        self._writer.executemany(
+                            'INSERT INTO chat_history (session_id, created_at, entry) VALUES (?, ?, ?)',
+                            rows
+                        )
+            finally:
+                with self._pending_lock:
+                    for taken_session, session_rows in taken.items():
+                        remaining = self._unwritten.get(taken_session, 0) - len(session_rows)
+                        if remaining > 0:
+                            self._unwritten[taken_session] = remaining
+                        else:
+                            self._unwritten.pop(taken_session, None)
+
+    def prune(self) -> None:
+        """Delete expired sessions, sessions beyond capacity and surplus interactions"""
+        with self._write_lock, self._writer:
+            cutoff = time.time() - self.ttl_seconds
+            evicted = self._writer.execute(
+                'SELECT COUNT(*) FROM (SELECT session_id FROM chat_history '
+                'GROUP BY session_id HAVING MAX(created_at) < ?)', (cutoff,)
+            ).fetchone()[0]
+            self._writer.execute(
+                'DELETE FROM chat_history WHERE session_id IN ('
+                ' SELECT session_id FROM chat_history GROUP BY session_id HAVING MAX(created_at) < ?)',
+                (cutoff,)
+            )
+            over_capacity = self._writer.execute(
+                'SELECT COUNT(DISTINCT session_id) FROM chat_history'
+            ).fetchone()[0] - self.capacity
+            if over_capacity > 0:
+                self._writer.execute(
+                    'DELETE FROM chat_history WHERE session_id IN ('
+                    ' SELECT session_id FROM chat_history GROUP BY session_id'
+                    ' ORDER BY MAX(created_at) ASC LIMIT ?)', (over_capacity,)
+                )
+                evicted += over_capacity
+            self._writer.execute(
+                'DELETE FROM chat_history WHERE id IN ('
+                ' SELECT id FROM (SELECT id, ROW_NUMBER() OVER ('
+                '  PARTITION BY session_id ORDER BY created_at DESC, id DESC) AS position'
+                '  FROM chat_history) WHERE position > ?)', (self.history_size,)
+            )
+            self._stats_snapshot['evicted_sessions'] += evicted
+
+    def close(self) -> None:
+        """Stop the background writer after persisting queued rows"""
+        if not self._stop.is_set():
+            self._stop.set()
+            self._thread.join(timeout=5)
+            self.flush()
+
+    def _run(self) -> None:
+        last_prune = last_stats = time.monotonic()
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+                now = time.monotonic()
+                if now - last_prune >= self.prune_interval:
+                    self.prune()
+                    last_prune = now
+                if now - last_stats >= self.stats_interval:
+                    self._refresh_stats()
+                    last_stats = now
+            except Exception:
+                # Keep the writer alive; otherwise queued rows are only written by get_history()
+                logger.exception("Session store background write failed")
+
+    def _refresh_stats(self) -> None:
+        total_sessions, total_queries = self._reader().execute(
+            'SELECT COUNT(DISTINCT session_id), COUNT(*) FROM chat_history'
+        ).fetchone()
+        self._stats_snapshot.update({'total_sessions': total_sessions, 'total_queries': total_queries})
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.db_path, timeout=5, check_same_thread=False)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        return connection
+
+    def _reader(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._connect()
+            self._local.connection = connection
+        return connection
+
+    def _create_schema(self) -> None:
+        with self._write_lock, self._writer:
+            self._writer.executescript("""
+                CREATE TABLE IF NOT EXISTS chat_history (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    session_id TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    entry TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_chat_history_session
+                    ON chat_history (session_id, created_at);
+                CREATE INDEX IF NOT EXISTS idx_chat_history_created
+                    ON chat_history (created_at);
+            """)
+
+
+def create_session_store(backend: str = 'memory', db_path: str = 'data/chat_history.db',
+                         **options) -> SessionStore:
+    """Build the chat history backend named by `backend` ('memory' or 'sqlite')"""
+    if backend == 'memory':
+        return InMemorySessionStore(**options)
+    if backend == 'sqlite':
+        return SQLiteSessionStore(db_path, **options)
+    raise ValueError(f"Unknown session backend: {backend}")
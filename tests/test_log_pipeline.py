@@ -0,0 +1,56 @@
+"""
+LogPipeline keeps writing in processes forked after setup (gunicorn --preload)
+
+Usage (from the repository root):
+    python -m pytest tests
+"""
+
+import json
+import logging
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'backend'))
+
+from observability.log_pipeline import LogPipeline  # noqa: E402
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='needs os.fork')
+def test_forked_child_records_reach_the_file(tmp_path):
+    pipeline = LogPipeline(tmp_path, 'app.log', console=False)
+    logger = logging.getLogger('test_log_pipeline')
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addHandler(pipeline.handler)
+    try:
+        logger.info('parent before fork')
+
+        pid = os.fork()
+        if pid == 0:
+            status = 1
+            try:
+                for i in range(5):
+                    logger.info('child %d', i)
+                pipeline.stop()
+                stats = pipeline.stats()
+                status = 0 if stats['written'] == 5 and stats['dropped'] == 0 else 1
+            finally:
+                os._exit(status)
+
+        _, status = os.waitpid(pid, 0)
+        assert os.WEXITSTATUS(status) == 0
+
+        logger.info('parent after fork')
+        pipeline.stop()
+    finally:
+        logger.removeHandler(pipeline.handler)
+
+    with open(tmp_path / 'app.log', encoding='utf-8') as f:
+        messages = [json.loads(line)['message'] for line in f]
+    assert sorted(messages) == sorted(
+        ['parent before fork', 'parent after fork'] + [f'child {i}' for i in range(5)]
+    )
+    assert pipeline.stats()['written'] == 2